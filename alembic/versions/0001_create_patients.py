@@ -31,9 +31,10 @@ def upgrade() -> None:
         sa.Column(
             "updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False
         ),
+        # Declared with the table so schema creation is a single create_table operation.
+        sa.Index(op.f("ix_patients_name"), "name", unique=False),
+        sa.Index(op.f("ix_patients_date_of_birth"), "date_of_birth", unique=False),
     )
-    op.create_index(op.f("ix_patients_name"), "patients", ["name"], unique=False)
-    op.create_index(op.f("ix_patients_date_of_birth"), "patients", ["date_of_birth"], unique=False)
 
 
 def downgrade() -> None:
@@ -59,16 +59,9 @@ def upgrade() -> None:
             "(checksum_sha256 IS NULL) OR (length(checksum_sha256) = 64)",
             name="patient_notes_checksum_len_64",
         ),
-    )
-
-    op.create_index(
-        op.f("ix_patient_notes_patient_id"), "patient_notes", ["patient_id"], unique=False
-    )
-    op.create_index(
-        "ix_patient_notes_patient_id_taken_at",
-        "patient_notes",
-        ["patient_id", "taken_at"],
-        unique=False,
+        # Declared with the table so schema creation is a single create_table operation.
+        sa.Index(op.f("ix_patient_notes_patient_id"), "patient_id", unique=False),
+        sa.Index("ix_patient_notes_patient_id_taken_at", "patient_id", "taken_at", unique=False),
     )
 
     op.create_table(
@@ -45,13 +45,8 @@ def upgrade() -> None:
             "schema",
             name="patient_note_structured_note_schema_unique",
         ),
-    )
-
-    op.create_index(
-        op.f("ix_patient_note_structured_note_id"),
-        "patient_note_structured",
-        ["note_id"],
-        unique=False,
+        # Declared with the table so schema creation is a single create_table operation.
+        sa.Index(op.f("ix_patient_note_structured_note_id"), "note_id", unique=False),
     )
 
 
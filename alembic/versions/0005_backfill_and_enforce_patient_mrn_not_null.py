@@ -14,12 +14,18 @@ Backfill strategy:
   MRN-<BASE32(UUID_BYTES)>
 - This avoids encoding PHI (not derived from name/DOB).
 - Uniqueness is guaranteed because UUID primary keys are unique.
+- SQLite derives the MRN in-database through a registered deterministic function, so the
+  backfill is a single UPDATE. PostgreSQL has no built-in base32 encoder, so ids are streamed
+  in batches and each batch is written with a single statement instead of one per row.
 """
 
 from __future__ import annotations
 
 import base64
+import os
 import uuid
+from collections.abc import Iterator
+from contextlib import contextmanager
 
 import sqlalchemy as sa
 from alembic import op
@@ -30,51 +36,152 @@ down_revision = "0004_add_patient_mrn"
 branch_labels = None
 depends_on = None
 
+_BACKFILL_BATCH_SIZE = 10_000
+
+# Opt-in (for isolated maintenance windows only): relax commit durability during the backfill.
+_FAST_BULK_WRITES_ENV = "MIGRATION_FAST_BULK_WRITES"
+
 
 def _mrn_from_uuid(*, patient_id: uuid.UUID) -> str:
     token = base64.b32encode(patient_id.bytes).decode("ascii").rstrip("=")  # 26 chars
     return f"MRN-{token}"
 
 
+def _mrn_from_raw_id(raw_id: object) -> str:
+    # SQLite may return a string; Postgres returns UUID.
+    patient_id = raw_id if isinstance(raw_id, uuid.UUID) else uuid.UUID(str(raw_id))
+    return _mrn_from_uuid(patient_id=patient_id)
+
+
+def _fast_bulk_writes_enabled() -> bool:
+    return os.getenv(_FAST_BULK_WRITES_ENV, "").strip().lower() in {"1", "true", "yes"}
+
+
+@contextmanager
+def _relaxed_durability(*, bind: sa.engine.Connection, dialect: str) -> Iterator[None]:
+    """
+    Skip the WAL flush wait for the backfill writes when explicitly enabled (PostgreSQL only).
+
+    The migration still commits atomically; only crash durability of the in-flight migration
+    is traded away, which is acceptable when the DB is offline for maintenance. SQLite is left
+    alone: its backfill is one statement in the migration transaction (a single journal sync),
+    and it refuses to change `synchronous` inside a transaction anyway.
+    """
+    if dialect == "postgresql" and _fast_bulk_writes_enabled():
+        # Scoped to the migration transaction; reverts automatically on commit/rollback.
+        bind.execute(sa.text("SET LOCAL synchronous_commit = off"))
+    yield
+
+
+def _backfill_mrns(*, bind: sa.engine.Connection, dialect: str) -> None:
+    if dialect == "sqlite":
+        # Compute the MRN inside SQLite: one statement, no ids round-tripped through Python.
+        bind.connection.create_function("mrn_from_uuid", 1, _mrn_from_raw_id, deterministic=True)
+        bind.execute(sa.text("UPDATE patients SET mrn = mrn_from_uuid(id) WHERE mrn IS NULL"))
+        return
+
+    # Stream ids through a server-side cursor so only one batch is held in memory at a time,
+    # and each fetched batch is transformed and written before the next one is pulled.
+    result = bind.execute(
+        sa.text("SELECT id FROM patients WHERE mrn IS NULL").execution_options(
+            stream_results=True, yield_per=_BACKFILL_BATCH_SIZE
+        )
+    )
+    for partition in result.partitions():
+        # Bind the raw id values back so they match the stored representation exactly.
+        ids = [raw_id for (raw_id,) in partition]
+        mrns = [_mrn_from_raw_id(raw_id) for raw_id in ids]
+
+        if dialect == "postgresql":
+            # One UPDATE ... FROM per batch instead of one statement per row.
+            bind.execute(
+                sa.text(
+                    "UPDATE patients AS p SET mrn = v.mrn "
+                    "FROM unnest(CAST(:ids AS uuid[]), CAST(:mrns AS text[])) AS v(id, mrn) "
+                    "WHERE p.id = v.id AND p.mrn IS NULL"
+                ),
+                {"ids": ids, "mrns": mrns},
+            )
+        else:
+            # A list of parameter sets is sent as a single executemany.
+            bind.execute(
+                sa.text("UPDATE patients SET mrn = :mrn WHERE id = :id AND mrn IS NULL"),
+                [{"id": raw_id, "mrn": mrn} for raw_id, mrn in zip(ids, mrns, strict=True)],
+            )
+
+
+def _create_mrn_unique_index() -> None:
+    op.create_index("uq_patients_mrn", "patients", ["mrn"], unique=True)
+
+
+def _mrn_is_nullable_sqlite(*, bind: sa.engine.Connection) -> bool:
+    for row in bind.execute(sa.text("PRAGMA table_info(patients)")):
+        if row.name == "mrn":
+            return not row.notnull
+    return True
+
+
+def _enforce_mrn_not_null_sqlite(*, bind: sa.engine.Connection) -> None:
+    # SQLite cannot add a NOT NULL / CHECK constraint in place, so this needs a full table
+    # rebuild (copy + reindex). Only pay for it when the column is actually still nullable.
+    if not _mrn_is_nullable_sqlite(bind=bind):
+        return
+
+    # SQLite requires batch mode (table rebuild) for altering nullability.
+    with op.batch_alter_table("patients") as batch:
+        batch.alter_column("mrn", existing_type=sa.String(length=50), nullable=False)
+
+    # Batch mode rebuilds the table; ensure our immutability trigger still exists.
+    # (SQLite doesn't automatically carry over triggers across rebuilds.)
+    op.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS patients_mrn_immutable
+        BEFORE UPDATE OF mrn ON patients
+        FOR EACH ROW
+        WHEN OLD.mrn IS NOT NULL AND (NEW.mrn IS NULL OR NEW.mrn != OLD.mrn)
+        BEGIN
+          SELECT RAISE(ABORT, 'mrn_immutable');
+        END;
+        """
+    )
+
+
+def _enforce_mrn_not_null_postgresql() -> None:
+    # A plain SET NOT NULL scans the table under an ACCESS EXCLUSIVE lock. Adding the
+    # equivalent CHECK as NOT VALID is instant, VALIDATE scans under a weaker lock, and
+    # SET NOT NULL then reuses the validated constraint instead of scanning again (PG12+).
+    op.execute(
+        "ALTER TABLE patients ADD CONSTRAINT ck_patients_mrn_not_null "
+        "CHECK (mrn IS NOT NULL) NOT VALID"
+    )
+    op.execute("ALTER TABLE patients VALIDATE CONSTRAINT ck_patients_mrn_not_null")
+    op.alter_column("patients", "mrn", existing_type=sa.String(length=50), nullable=False)
+    op.execute("ALTER TABLE patients DROP CONSTRAINT ck_patients_mrn_not_null")
+
+
 def upgrade() -> None:
     bind = op.get_bind()
     dialect = bind.dialect.name
 
+    # Drop the unique index for the duration of the backfill so the bulk UPDATE does not pay
+    # per-row btree maintenance; it is rebuilt once below. Backfilled MRNs are derived from
+    # unique UUIDs, so uniqueness is re-validated when the index is recreated.
+    op.drop_index("uq_patients_mrn", table_name="patients")
+
     # Backfill any NULL MRNs before enforcing NOT NULL.
-    rows = bind.execute(sa.text("SELECT id FROM patients WHERE mrn IS NULL")).fetchall()
-    for (raw_id,) in rows:
-        # SQLite may return a string; Postgres returns UUID.
-        patient_id = raw_id if isinstance(raw_id, uuid.UUID) else uuid.UUID(str(raw_id))
-        mrn = _mrn_from_uuid(patient_id=patient_id)
-        bind.execute(
-            sa.text("UPDATE patients SET mrn = :mrn WHERE id = :id AND mrn IS NULL"),
-            {"mrn": mrn, "id": str(patient_id)},
-        )
+    with _relaxed_durability(bind=bind, dialect=dialect):
+        _backfill_mrns(bind=bind, dialect=dialect)
 
     # Enforce NOT NULL.
     if dialect == "sqlite":
-        # SQLite requires batch mode (table rebuild) for altering nullability.
-        with op.batch_alter_table("patients") as batch:
-            batch.alter_column("mrn", existing_type=sa.String(length=50), nullable=False)
-
-        # Batch mode rebuilds the table; ensure our immutability trigger and unique index still exist.
-        # (SQLite doesn't automatically carry over triggers across rebuilds.)
-        op.execute("DROP INDEX IF EXISTS uq_patients_mrn;")
-        op.create_index("uq_patients_mrn", "patients", ["mrn"], unique=True)
-        op.execute(
-            """
-            CREATE TRIGGER IF NOT EXISTS patients_mrn_immutable
-            BEFORE UPDATE OF mrn ON patients
-            FOR EACH ROW
-            WHEN OLD.mrn IS NOT NULL AND (NEW.mrn IS NULL OR NEW.mrn != OLD.mrn)
-            BEGIN
-              SELECT RAISE(ABORT, 'mrn_immutable');
-            END;
-            """
-        )
+        _enforce_mrn_not_null_sqlite(bind=bind)
+    elif dialect == "postgresql":
+        _enforce_mrn_not_null_postgresql()
     else:
         op.alter_column("patients", "mrn", existing_type=sa.String(length=50), nullable=False)
 
+    _create_mrn_unique_index()
+
 
 def downgrade() -> None:
     # Revert NOT NULL, keep values (do not attempt to null-out).
@@ -86,5 +193,3 @@ def downgrade() -> None:
             batch.alter_column("mrn", existing_type=sa.String(length=50), nullable=True)
     else:
         op.alter_column("patients", "mrn", existing_type=sa.String(length=50), nullable=True)
-
-
@@ -0,0 +1,47 @@
+"""index active patient notes timeline
+
+Revision ID: 0006_active_notes_index
+Revises: 0005_patient_mrn_not_null
+Create Date: 2025-12-19
+
+Timeline queries always filter `deleted_at IS NULL`. A partial index over live rows only is
+smaller than the full composite index and lets the planner skip tombstoned notes entirely.
+`id` is included because it is the sort tie-breaker (taken_at DESC, id DESC).
+The single-column `ix_patient_notes_patient_id` index is kept for historical queries.
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0006_active_notes_index"
+down_revision = "0005_patient_mrn_not_null"
+branch_labels = None
+depends_on = None
+
+_ACTIVE_NOTES_WHERE = "deleted_at IS NULL"
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_patient_notes_active_patient_id_taken_at",
+        "patient_notes",
+        ["patient_id", "taken_at", "id"],
+        unique=False,
+        postgresql_where=sa.text(_ACTIVE_NOTES_WHERE),
+        sqlite_where=sa.text(_ACTIVE_NOTES_WHERE),
+    )
+    op.drop_index("ix_patient_notes_patient_id_taken_at", table_name="patient_notes")
+
+
+def downgrade() -> None:
+    op.create_index(
+        "ix_patient_notes_patient_id_taken_at",
+        "patient_notes",
+        ["patient_id", "taken_at"],
+        unique=False,
+    )
+    op.drop_index("ix_patient_notes_active_patient_id_taken_at", table_name="patient_notes")
@@ -0,0 +1,83 @@
+"""combine patient notes check constraints
+
+Revision ID: 0007_notes_content_rules
+Revises: 0006_active_notes_index
+Create Date: 2025-12-19
+
+The four content CHECK constraints on `patient_notes` are fused into a single predicate so each
+INSERT/UPDATE evaluates one constraint instead of four. "Has content" + "content XOR file" become
+one boolean inequality (exactly one of inline text / file path is set). Rules are unchanged.
+
+On PostgreSQL the new constraint is added NOT VALID (no scan under ACCESS EXCLUSIVE) and then
+validated separately under a weaker lock. SQLite cannot alter constraints in place, so it uses a
+batch table rebuild.
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0007_notes_content_rules"
+down_revision = "0006_active_notes_index"
+branch_labels = None
+depends_on = None
+
+_CONTENT_RULES_NAME = "patient_notes_content_rules"
+_CONTENT_RULES = (
+    "((content_text IS NOT NULL) != (file_path IS NOT NULL)) "
+    "AND ((file_path IS NULL) OR (file_path NOT LIKE '/%' AND file_path NOT LIKE '%..%')) "
+    "AND ((checksum_sha256 IS NULL) OR (length(checksum_sha256) = 64))"
+)
+
+_LEGACY_CHECKS = {
+    "patient_notes_has_content": "(content_text IS NOT NULL) OR (file_path IS NOT NULL)",
+    "patient_notes_content_xor_file": "NOT (content_text IS NOT NULL AND file_path IS NOT NULL)",
+    "patient_notes_file_path_relative": (
+        "(file_path IS NULL) OR (file_path NOT LIKE '/%' AND file_path NOT LIKE '%..%')"
+    ),
+    "patient_notes_checksum_len_64": (
+        "(checksum_sha256 IS NULL) OR (length(checksum_sha256) = 64)"
+    ),
+}
+
+
+def _full_name(name: str) -> str:
+    # Matches the metadata naming convention: ck_<table>_<constraint_name>.
+    return f"ck_patient_notes_{name}"
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+
+    if bind.dialect.name == "sqlite":
+        with op.batch_alter_table("patient_notes") as batch:
+            for name in _LEGACY_CHECKS:
+                batch.drop_constraint(op.f(_full_name(name)), type_="check")
+            batch.create_check_constraint(_CONTENT_RULES_NAME, _CONTENT_RULES)
+        return
+
+    op.create_check_constraint(
+        _CONTENT_RULES_NAME, "patient_notes", _CONTENT_RULES, postgresql_not_valid=True
+    )
+    if bind.dialect.name == "postgresql":
+        op.execute(
+            f"ALTER TABLE patient_notes VALIDATE CONSTRAINT {_full_name(_CONTENT_RULES_NAME)}"
+        )
+    for name in _LEGACY_CHECKS:
+        op.drop_constraint(op.f(_full_name(name)), "patient_notes", type_="check")
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+
+    if bind.dialect.name == "sqlite":
+        with op.batch_alter_table("patient_notes") as batch:
+            batch.drop_constraint(op.f(_full_name(_CONTENT_RULES_NAME)), type_="check")
+            for name, condition in _LEGACY_CHECKS.items():
+                batch.create_check_constraint(name, condition)
+        return
+
+    for name, condition in _LEGACY_CHECKS.items():
+        op.create_check_constraint(name, "patient_notes", condition)
+    op.drop_constraint(op.f(_full_name(_CONTENT_RULES_NAME)), "patient_notes", type_="check")
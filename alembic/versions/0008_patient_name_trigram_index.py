@@ -0,0 +1,48 @@
+"""trigram index for patient name search
+
+Revision ID: 0008_patient_name_trgm
+Revises: 0007_notes_content_rules
+Create Date: 2025-12-19
+
+Patient search is a case-insensitive substring match (`name ILIKE '%q%'`), which a btree index
+cannot serve, so every search scanned the whole table. A GIN index over `pg_trgm` trigrams lets
+PostgreSQL answer ILIKE substring predicates from the index.
+
+PostgreSQL only: `pg_trgm` ships with PostgreSQL contrib, but creating the extension needs a role
+allowed to do so (it is a no-op when already installed). SQLite has no equivalent and keeps
+scanning, which is fine for local development.
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0008_patient_name_trgm"
+down_revision = "0007_notes_content_rules"
+branch_labels = None
+depends_on = None
+
+_INDEX_NAME = "ix_patients_name_trgm"
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        _INDEX_NAME,
+        "patients",
+        ["name"],
+        postgresql_using="gin",
+        postgresql_ops={"name": "gin_trgm_ops"},
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    # The extension is left installed: other objects may depend on it.
+    op.drop_index(_INDEX_NAME, table_name="patients")
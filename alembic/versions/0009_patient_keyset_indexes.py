@@ -0,0 +1,40 @@
+"""composite keyset indexes for patient listing
+
+Revision ID: 0009_patient_keyset_indexes
+Revises: 0008_patient_name_trgm
+Create Date: 2025-12-19
+
+The patient list is keyset-paginated on `(sort_col, id)` for `name`, `date_of_birth` and
+`created_at`. A composite index per sort key turns both the ORDER BY and the cursor predicate
+into a single index range scan, whatever the page depth. `created_at` had no index at all, so
+the default listing sorted the whole table.
+
+The single-column `name` / `date_of_birth` indexes are prefixes of the new composites and are
+dropped.
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0009_patient_keyset_indexes"
+down_revision = "0008_patient_name_trgm"
+branch_labels = None
+depends_on = None
+
+_SORT_COLUMNS = ("name", "date_of_birth", "created_at")
+
+
+def upgrade() -> None:
+    for column in _SORT_COLUMNS:
+        op.create_index(f"ix_patients_{column}_id", "patients", [column, "id"], unique=False)
+    op.drop_index("ix_patients_name", table_name="patients")
+    op.drop_index("ix_patients_date_of_birth", table_name="patients")
+
+
+def downgrade() -> None:
+    op.create_index("ix_patients_name", "patients", ["name"], unique=False)
+    op.create_index("ix_patients_date_of_birth", "patients", ["date_of_birth"], unique=False)
+    for column in _SORT_COLUMNS:
+        op.drop_index(f"ix_patients_{column}_id", table_name="patients")
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
+import asyncio
+import logging
 from collections.abc import AsyncIterator
+from contextlib import AsyncExitStack
 from typing import Any
 
-from fastapi import Request
-from sqlalchemy import MetaData
+from sqlalchemy import MetaData, event, make_url, text
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
@@ -12,6 +14,9 @@ from sqlalchemy.ext.asyncio import (
     create_async_engine,
 )
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import NullPool
+
+logger = logging.getLogger("app.db")
 
 
 def _create_naming_convention() -> dict[str, str]:
@@ -26,33 +31,107 @@ def _create_naming_convention() -> dict[str, str]:
 
 metadata_obj = MetaData(naming_convention=_create_naming_convention())
 
+# Bound once at startup (see `init_db`) so the per-request session dependency is a single
+# global load instead of a walk through `request.app.state`.
+_SESSIONMAKER: async_sessionmaker[AsyncSession] | None = None
+
 
 class Base(DeclarativeBase):
     metadata = metadata_obj
 
 
-def create_engine(*, database_url: str) -> AsyncEngine:
-    return create_async_engine(database_url, pool_pre_ping=True)
+def _enable_sqlite_foreign_keys(dbapi_connection: Any, _connection_record: Any) -> None:
+    # SQLite only enforces FOREIGN KEY constraints when asked to, per connection. Enforce them
+    # so SQLite behaves like PostgreSQL (writes may rely on FK violations, e.g. unknown patient).
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("PRAGMA foreign_keys=ON")
+    finally:
+        cursor.close()
+
+
+def create_engine(
+    *,
+    database_url: str,
+    pool_size: int = 20,
+    max_overflow: int = 10,
+    pool_recycle: int = 1800,
+    pool_pre_ping: bool = False,
+) -> AsyncEngine:
+    if make_url(database_url).get_backend_name() == "sqlite":
+        # SQLite pools are process-local file handles; sizing/recycling does not apply.
+        engine = create_async_engine(database_url, pool_pre_ping=pool_pre_ping)
+        event.listen(engine.sync_engine, "connect", _enable_sqlite_foreign_keys)
+        return engine
+
+    return create_async_engine(
+        database_url,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_recycle=pool_recycle,
+        pool_pre_ping=pool_pre_ping,
+    )
 
 
 def create_sessionmaker(*, engine: AsyncEngine) -> async_sessionmaker[AsyncSession]:
     return async_sessionmaker(engine, expire_on_commit=False)
 
 
-def init_db(*, app: Any, database_url: str) -> None:
-    engine = create_engine(database_url=database_url)
+def init_db(*, app: Any, database_url: str, **engine_options: Any) -> None:
+    global _SESSIONMAKER
+
+    engine = create_engine(database_url=database_url, **engine_options)
     app.state.db_engine = engine
     app.state.db_sessionmaker = create_sessionmaker(engine=engine)
+    _SESSIONMAKER = app.state.db_sessionmaker
+
+
+async def warm_up_db(*, app: Any, connections: int = 1) -> None:
+    """
+    Open `connections` pooled connections at startup so early requests don't pay connect latency.
+
+    The connections are checked out concurrently (so the pool really opens that many rather than
+    reusing one) and returned to the pool idle. Pools without reuse (SQLite's NullPool) only get
+    a single probe.
+
+    Best-effort: the API must still start (and /health must still answer) if the database is
+    temporarily unreachable; requests will connect lazily as before.
+    """
+
+    engine: AsyncEngine | None = getattr(app.state, "db_engine", None)
+    if engine is None or connections <= 0:
+        return
+    if isinstance(engine.pool, NullPool):
+        connections = 1
+
+    async def _probe(stack: AsyncExitStack) -> None:
+        conn = await stack.enter_async_context(engine.connect())
+        await conn.execute(text("SELECT 1"))
+
+    async with AsyncExitStack() as stack:
+        # `return_exceptions` so every probe has settled before the stack closes what it opened.
+        results = await asyncio.gather(
+            *(_probe(stack) for _ in range(connections)), return_exceptions=True
+        )
+    errors = [r for r in results if isinstance(r, BaseException)]
+    if errors:
+        logger.warning("Database warm-up failed (error=%s)", errors[0].__class__.__name__)
 
 
 async def close_db(*, app: Any) -> None:
+    global _SESSIONMAKER
+
+    if _SESSIONMAKER is getattr(app.state, "db_sessionmaker", None):
+        _SESSIONMAKER = None
+
     engine: AsyncEngine | None = getattr(app.state, "db_engine", None)
     if engine is None:
         return
     await engine.dispose()
 
 
-async def get_session(request: Request) -> AsyncIterator[AsyncSession]:
-    sessionmaker: async_sessionmaker[AsyncSession] = request.app.state.db_sessionmaker
-    async with sessionmaker() as session:
+async def get_session() -> AsyncIterator[AsyncSession]:
+    if _SESSIONMAKER is None:
+        raise RuntimeError("Database is not initialized; init_db() must run at startup.")
+    async with _SESSIONMAKER() as session:
         yield session
@@ -1,19 +1,57 @@
 from __future__ import annotations
 
+import asyncio
+
 from app.core.llm.openai_client import OpenAIClient, OpenAIConfig
-from app.core.settings import get_settings
+from app.core.settings import Settings, get_settings
+
+# Shared across requests so the underlying HTTP connection pool is reused.
+_shared_client: OpenAIClient | None = None
+# The `get_settings()` instance `_shared_client` was built from. Settings are cached, so an
+# identity check is enough to skip rebuilding `OpenAIConfig` on every request.
+_shared_settings: Settings | None = None
+# Clients replaced by a reconfiguration, keyed by their deferred-close task (the strong refs
+# also keep the tasks alive).
+_retiring_clients: dict[asyncio.Task[None], OpenAIClient] = {}
+
+
+async def _close_after_grace(client: OpenAIClient) -> None:
+    # Requests that already hold the replaced client may still be waiting on it; give them up to
+    # one client timeout to finish before its pool is closed (immediately on shutdown).
+    await asyncio.sleep(client.config.timeout_seconds)
+    await client.aclose()
+
+
+def _retire_shared_client() -> None:
+    global _shared_client, _shared_settings
+
+    client, _shared_client = _shared_client, None
+    _shared_settings = None
+    if client is not None:
+        task = asyncio.get_running_loop().create_task(_close_after_grace(client))
+        _retiring_clients[task] = client
+        task.add_done_callback(lambda done: _retiring_clients.pop(done, None))
 
 
-def get_openai_client() -> OpenAIClient | None:
+async def get_openai_client() -> OpenAIClient | None:
     """
     Dependency provider for OpenAIClient.
 
     Returns None when not configured so routes can return a safe 502 without
-    raising during dependency resolution.
+    raising during dependency resolution. Otherwise returns a process-wide client
+    (rebuilt only if the settings are reloaded with a different configuration).
+    A client dropped by a reload is closed in the background after a grace period.
+
+    Async so FastAPI calls it on the event loop (no threadpool hop).
     """
 
+    global _shared_client, _shared_settings
+
     settings = get_settings()
+    if settings is _shared_settings and _shared_client is not None:
+        return _shared_client
     if not settings.openai_api_key:
+        _retire_shared_client()
         return None
 
     config = OpenAIConfig(
@@ -22,6 +60,27 @@ def get_openai_client() -> OpenAIClient | None:
         model=settings.openai_model,
         timeout_seconds=float(settings.openai_timeout_seconds),
     )
-    return OpenAIClient(config=config)
+    if _shared_client is None or _shared_client.config != config:
+        _retire_shared_client()
+        _shared_client = OpenAIClient(config=config)
+    _shared_settings = settings
+    return _shared_client
+
+
+async def close_openai_client() -> None:
+    """
+    Close the shared client's connection pool (called on application shutdown), along with any
+    replaced client still waiting out its grace period.
+    """
 
+    global _shared_client, _shared_settings
 
+    client, _shared_client = _shared_client, None
+    _shared_settings = None
+    retiring = list(_retiring_clients.items())
+    _retiring_clients.clear()
+    for task, retired in retiring:
+        task.cancel()
+        await retired.aclose()
+    if client is not None:
+        await client.aclose()
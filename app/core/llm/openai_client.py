@@ -1,10 +1,10 @@
 from __future__ import annotations
 
-import json
 from dataclasses import dataclass
 from typing import Any
 
 import httpx
+import orjson
 
 
 class OpenAIError(Exception):
@@ -35,17 +35,30 @@ class OpenAIClient:
     - No logging in this module (prompts/outputs may contain PHI).
     - Deterministic generation (temperature=0) and stateless requests.
     - Returns parsed JSON, validated by caller Pydantic schemas.
+    - One long-lived `httpx.AsyncClient` per instance so keep-alive connections (and their
+      TCP/TLS handshakes) are reused across calls. Call `aclose()` on shutdown.
     """
 
     def __init__(self, *, config: OpenAIConfig):
         self._config = config
+        self._url = f"{config.base_url.rstrip('/')}/chat/completions"
+        self._client = httpx.AsyncClient(
+            timeout=config.timeout_seconds,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            headers={
+                "Authorization": f"Bearer {config.api_key}",
+                "Content-Type": "application/json",
+            },
+        )
+
+    @property
+    def config(self) -> OpenAIConfig:
+        return self._config
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
 
     async def generate_json(self, *, system_prompt: str, user_prompt: str) -> dict[str, Any]:
-        url = f"{self._config.base_url.rstrip('/')}/chat/completions"
-        headers = {
-            "Authorization": f"Bearer {self._config.api_key}",
-            "Content-Type": "application/json",
-        }
         payload: dict[str, Any] = {
             "model": self._config.model,
             "temperature": 0,
@@ -58,8 +71,8 @@ class OpenAIClient:
         }
 
         try:
-            async with httpx.AsyncClient(timeout=self._config.timeout_seconds) as client:
-                resp = await client.post(url, headers=headers, json=payload)
+            # Content-Type is a client default header; encode with orjson rather than stdlib json.
+            resp = await self._client.post(self._url, content=orjson.dumps(payload))
         except httpx.TimeoutException as exc:
             raise OpenAIUpstreamError("LLM request timed out") from exc
         except httpx.HTTPError as exc:
@@ -70,9 +83,8 @@ class OpenAIClient:
             raise OpenAIUpstreamError("LLM service returned an error")
 
         try:
-            data = resp.json()
-            content = data["choices"][0]["message"]["content"]
-            parsed = json.loads(content)
+            choice = orjson.loads(resp.content)["choices"][0]
+            parsed = orjson.loads(choice["message"]["content"])
         except Exception as exc:  # noqa: BLE001
             raise OpenAIUpstreamError("LLM response was not valid JSON") from exc
 
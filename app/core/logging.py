@@ -8,17 +8,35 @@ This config is intentionally designed for healthcare environments:
 
 from __future__ import annotations
 
-import json
+import atexit
+import copy
 import logging
 import logging.config
+import logging.handlers
 import os
-from datetime import UTC, datetime
+import queue
+import time
 from typing import Any
 
+import orjson
+
 _app_env = os.getenv("APP_ENV", "production").strip().lower()
 _default_log_level = "DEBUG" if _app_env == "development" else "INFO"
 LOG_LEVEL = os.getenv("LOG_LEVEL", _default_log_level).upper()
 
+_TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
+
+def _format_timestamp(created: float) -> str:
+    """Format an epoch timestamp as RFC 3339 UTC with microseconds (e.g. ...T12:00:00.000123Z).
+
+    Uses `time.gmtime` + integer math rather than building a `datetime` per log record.
+    """
+
+    seconds = int(created)
+    micros = int((created - seconds) * 1_000_000)
+    return f"{time.strftime(_TIMESTAMP_FORMAT, time.gmtime(seconds))}.{micros:06d}Z"
+
 
 class JsonFormatter(logging.Formatter):
     """Emit JSON logs while safely handling missing `extra` fields.
@@ -29,7 +47,7 @@ class JsonFormatter(logging.Formatter):
 
     def format(self, record: logging.LogRecord) -> str:
         payload: dict[str, Any] = {
-            "timestamp": datetime.fromtimestamp(record.created, tz=UTC).isoformat(),
+            "timestamp": _format_timestamp(record.created),
             "level": record.levelname,
             "logger": record.name,
             "message": record.getMessage(),
@@ -48,11 +66,66 @@ class JsonFormatter(logging.Formatter):
         if record.exc_info:
             payload["exception"] = self.formatException(record.exc_info)
 
-        return json.dumps(payload, ensure_ascii=False)
+        # orjson emits UTF-8 directly (no ASCII escaping) and is markedly faster than stdlib
+        # json on this per-record path. `default=str` keeps unexpected `extra` types from raising.
+        return orjson.dumps(payload, default=str).decode("utf-8")
+
+
+class _InProcessQueueHandler(logging.handlers.QueueHandler):
+    """Enqueue records for the listener thread without pre-formatting them.
+
+    The stock `prepare()` formats the record and drops `exc_info` (it assumes the queue may
+    cross a process boundary). Our queue is in-process, so we only merge `msg % args` (so
+    mutable args can't change after enqueue) and leave JSON formatting to the listener.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+_queue_listener: logging.handlers.QueueListener | None = None
+
+
+def _stop_queue_listener() -> None:
+    global _queue_listener
+
+    listener, _queue_listener = _queue_listener, None
+    if listener is not None:
+        # Drains any queued records before returning.
+        listener.stop()
+
+
+def _install_queue_handler(root: logging.Logger) -> None:
+    """Move the root handlers behind a queue drained by a background thread.
+
+    Request paths then only pay for building the record and a queue put; formatting and the
+    stdout write happen off the event loop.
+    """
+
+    global _queue_listener
+
+    _stop_queue_listener()
+
+    handlers = list(root.handlers)
+    log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    for handler in handlers:
+        root.removeHandler(handler)
+    root.addHandler(_InProcessQueueHandler(log_queue))
+
+    _queue_listener = logging.handlers.QueueListener(
+        log_queue, *handlers, respect_handler_level=True
+    )
+    _queue_listener.start()
+
+
+atexit.register(_stop_queue_listener)
 
 
 def setup_logging() -> None:
-    """Configure application logging (JSON to stdout)."""
+    """Configure application logging (JSON to stdout, written from a background thread)."""
 
     logging.config.dictConfig(
         {
@@ -82,3 +155,5 @@ def setup_logging() -> None:
             },
         }
     )
+
+    _install_queue_handler(logging.getLogger())
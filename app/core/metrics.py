@@ -3,10 +3,12 @@ from __future__ import annotations
 import time
 from typing import cast
 
-from fastapi import APIRouter, Request
+from fastapi import APIRouter
 from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, generate_latest
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
 from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.middleware.route_label import safe_route_label
 
 metrics_router = APIRouter(tags=["monitoring"])
 
@@ -28,40 +30,58 @@ http_request_duration_seconds = Histogram(
     buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
 )
 
+# Label sets are bounded (method x route template x status code), but cap the child cache
+# anyway so unexpected label churn cannot grow memory without limit.
+_LABEL_CACHE_MAX_SIZE = 1024
 
-def _safe_route_label(request: Request) -> str:
-    """
-    Return a safe route label.
 
-    Prefer the Starlette/FastAPI route template (e.g. /patients/{patient_id}).
-    If routing didn't match (404) or is otherwise unavailable, return "unmatched"
-    to avoid leaking raw paths that may contain identifiers.
+class PrometheusMetricsMiddleware:
+    """Record request count and latency per (method, route template, status code).
+
+    Plain ASGI middleware: the status code is captured from the `http.response.start`
+    message instead of materializing a Response object.
     """
 
-    route = request.scope.get("route")
-    path = getattr(route, "path", None)
-    if isinstance(path, str) and path:
-        return path
-    return "unmatched"
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        # (method, route, status_code) -> (counter child, histogram child)
+        self._label_cache: dict[tuple[str, str, str], tuple[Counter, Histogram]] = {}
 
+    def _children(self, key: tuple[str, str, str]) -> tuple[Counter, Histogram]:
+        children = self._label_cache.get(key)
+        if children is None:
+            children = (
+                http_requests_total.labels(*key),
+                http_request_duration_seconds.labels(*key),
+            )
+            if len(self._label_cache) < _LABEL_CACHE_MAX_SIZE:
+                self._label_cache[key] = children
+        return children
 
-class PrometheusMetricsMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
-        started = time.perf_counter()
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started_ns = time.monotonic_ns()
         status_code = 500
+
+        async def send_capturing_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
         try:
-            response = await call_next(request)
-            status_code = response.status_code
-            return response
+            await self.app(scope, receive, send_capturing_status)
         finally:
-            route_label = _safe_route_label(request)
-            method = request.method
-            code = str(int(status_code))
-            duration = time.perf_counter() - started
-            http_requests_total.labels(method=method, route=route_label, status_code=code).inc()
-            http_request_duration_seconds.labels(
-                method=method, route=route_label, status_code=code
-            ).observe(duration)
+            duration = (time.monotonic_ns() - started_ns) / 1e9
+            # Positional label order matches `labelnames`: (method, route, status_code).
+            counter, histogram = self._children(
+                (scope["method"], safe_route_label(scope), str(int(status_code)))
+            )
+            counter.inc()
+            histogram.observe(duration)
 
 
 @metrics_router.get("/metrics", include_in_schema=False)
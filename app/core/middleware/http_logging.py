@@ -9,95 +9,156 @@ Design goals:
 from __future__ import annotations
 
 import logging
-import re
+import os
+import string
 import time
-import uuid
 
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
-from starlette.responses import Response
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.middleware.route_label import safe_route_label
 
 logger = logging.getLogger("app.http")
 
 _REQUEST_ID_HEADER = "X-Request-ID"
-_SAFE_REQUEST_ID_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]{0,127}$")
+_REQUEST_ID_HEADER_RAW = _REQUEST_ID_HEADER.lower().encode("latin-1")
+# Accepted propagated ids: 1-128 chars of [A-Za-z0-9._-], starting with an alphanumeric.
+_REQUEST_ID_MAX_LENGTH = 128
+_REQUEST_ID_ALLOWED_BYTES = (string.ascii_letters + string.digits + "._-").encode("ascii")
 
+# Generated ids are sliced from a pre-read block of random bytes so most requests skip the
+# `os.urandom` syscall. Requests are handled on a single event loop per worker, so the pool
+# needs no lock; it is discarded after fork so workers never share (and repeat) random bytes.
+_REQUEST_ID_RANDOM_BYTES = 16
+_RANDOM_POOL_SIZE = 4096
+_random_pool = memoryview(b"")
+_random_pool_offset = 0
 
-def _get_or_create_request_id(*, request: Request) -> str:
-    """Return a safe request id, either propagated or newly generated.
 
-    We only accept a narrow character set and length to avoid log injection and
-    other unexpected values. If invalid, we generate a new UUID4.
-    """
+def _reset_random_pool() -> None:
+    global _random_pool, _random_pool_offset
+    _random_pool = memoryview(b"")
+    _random_pool_offset = 0
 
-    candidate = request.headers.get(_REQUEST_ID_HEADER)
-    if candidate and _SAFE_REQUEST_ID_PATTERN.fullmatch(candidate):
-        return candidate
-    return uuid.uuid4().hex
 
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_random_pool)
 
-def _safe_route_label(*, request: Request) -> str:
-    """
-    Return a safe path label for logs.
 
-    Prefer the framework's route template (e.g. /patients/{patient_id}) to avoid
-    logging identifiers present in raw URLs.
+def _new_request_id() -> str:
+    global _random_pool, _random_pool_offset
+    end = _random_pool_offset + _REQUEST_ID_RANDOM_BYTES
+    if end > len(_random_pool):
+        _random_pool = memoryview(os.urandom(_RANDOM_POOL_SIZE))
+        _random_pool_offset = 0
+        end = _REQUEST_ID_RANDOM_BYTES
+    chunk = _random_pool[_random_pool_offset:end]
+    _random_pool_offset = end
+    return chunk.hex()
+
+
+def _is_safe_request_id(value: bytes) -> bool:
+    # `translate(None, delete=...)` strips every allowed byte in a single C-level pass;
+    # anything left over is a disallowed character.
+    return (
+        0 < len(value) <= _REQUEST_ID_MAX_LENGTH
+        and value[:1].isalnum()
+        and not value.translate(None, _REQUEST_ID_ALLOWED_BYTES)
+    )
+
+
+def _get_or_create_request_id(*, scope: Scope) -> tuple[str, bool]:
+    """Return a safe request id, either propagated or newly generated.
+
+    We only accept a narrow character set and length to avoid log injection and
+    other unexpected values. If invalid, we generate a new random 128-bit hex id
+    (same shape as `uuid4().hex`, without building a UUID object).
+
+    The boolean is True when the id came from the incoming request headers.
     """
 
-    route = request.scope.get("route")
-    path = getattr(route, "path", None)
-    if isinstance(path, str) and path:
-        return path
-    return "unmatched"
+    for name, value in scope["headers"]:
+        if name == _REQUEST_ID_HEADER_RAW:
+            if _is_safe_request_id(value):
+                return value.decode("ascii"), True
+            break
+    return _new_request_id(), False
 
 
-class HttpLoggingMiddleware(BaseHTTPMiddleware):
+class HttpLoggingMiddleware:
     """Log request/response metadata and propagate a correlation id.
 
+    Implemented as plain ASGI middleware (rather than `BaseHTTPMiddleware`) to avoid the
+    per-request task group and response re-wrapping on the hot path.
+
     IMPORTANT: This middleware intentionally does NOT log:
     - request body / response body (may contain PHI)
     - query string values (may contain PHI, e.g. patient names)
     - headers (may contain auth tokens or PHI)
     """
 
-    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
-        request_id = _get_or_create_request_id(request=request)
-        started = time.perf_counter()
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id, propagated = _get_or_create_request_id(scope=scope)
+        started_ns = time.monotonic_ns()
         # Make request_id available to downstream handlers/services for safe correlation logging.
         # This avoids re-generating IDs or reading query/body data for correlation.
-        request.state.request_id = request_id
+        scope.setdefault("state", {})["request_id"] = request_id
+        if not propagated:
+            # Expose the generated id as a request header too, replacing any unsafe value.
+            scope["headers"] = [
+                *(h for h in scope["headers"] if h[0] != _REQUEST_ID_HEADER_RAW),
+                (_REQUEST_ID_HEADER_RAW, request_id.encode("latin-1")),
+            ]
+
+        status_code = 500
+
+        async def send_with_request_id(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                # Ensure correlation id is present on all responses.
+                MutableHeaders(scope=message)[_REQUEST_ID_HEADER] = request_id
+            await send(message)
 
         try:
-            response = await call_next(request)
+            await self.app(scope, receive, send_with_request_id)
         except Exception:  # noqa: BLE001 - we must log unexpected exceptions with stack trace
-            duration_ms = (time.perf_counter() - started) * 1000.0
-            safe_path = _safe_route_label(request=request)
+            duration_ms = (time.monotonic_ns() - started_ns) / 1e6
+            safe_path = safe_route_label(scope)
             logger.exception(
                 "Unhandled exception while processing request",
                 extra={
                     "request_id": request_id,
-                    "http_method": request.method,
+                    "http_method": scope["method"],
                     "request_path": safe_path,
                     "status_code": 500,
-                    "duration_ms": round(duration_ms, 2),
+                    "duration_ms": duration_ms,
                 },
             )
             raise
 
-        duration_ms = (time.perf_counter() - started) * 1000.0
-        safe_path = _safe_route_label(request=request)
+        # Skip building the `extra` payload entirely when INFO is filtered out (e.g. WARNING in
+        # production); `isEnabledFor` is cached by the logging module.
+        if not logger.isEnabledFor(logging.INFO):
+            return
 
-        # Ensure correlation id is present on all responses.
-        response.headers[_REQUEST_ID_HEADER] = request_id
+        duration_ms = (time.monotonic_ns() - started_ns) / 1e6
+        safe_path = safe_route_label(scope)
 
         logger.info(
             "Request completed",
             extra={
                 "request_id": request_id,
-                "http_method": request.method,
+                "http_method": scope["method"],
                 "request_path": safe_path,
-                "status_code": response.status_code,
-                "duration_ms": round(duration_ms, 2),
+                "status_code": status_code,
+                "duration_ms": duration_ms,
             },
         )
-        return response
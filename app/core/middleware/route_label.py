@@ -0,0 +1,40 @@
+"""Safe route labels for logs and metrics."""
+
+from __future__ import annotations
+
+from starlette.types import Scope
+
+_UNMATCHED = "unmatched"
+
+# Label sets are bounded by the number of routes, but cap the cache anyway.
+_ROUTE_LABEL_CACHE_MAX_SIZE = 1024
+
+# Route objects live for the whole process, so their labels are resolved once. Routes are not
+# hashable (they define `__eq__`), so entries are keyed by `id(route)` and keep a reference to
+# the route: the id cannot be recycled while cached, and the identity check guards the lookup.
+_ROUTE_LABEL_CACHE: dict[int, tuple[object, str]] = {}
+
+
+def safe_route_label(scope: Scope) -> str:
+    """
+    Return a safe route label.
+
+    Prefer the Starlette/FastAPI route template (e.g. /patients/{patient_id}).
+    If routing didn't match (404) or is otherwise unavailable, return "unmatched"
+    to avoid leaking raw paths that may contain identifiers.
+    """
+
+    route = scope.get("route")
+    if route is None:
+        return _UNMATCHED
+
+    route_id = id(route)
+    entry = _ROUTE_LABEL_CACHE.get(route_id)
+    if entry is not None and entry[0] is route:
+        return entry[1]
+
+    path = getattr(route, "path", None)
+    label = path if isinstance(path, str) and path else _UNMATCHED
+    if len(_ROUTE_LABEL_CACHE) < _ROUTE_LABEL_CACHE_MAX_SIZE:
+        _ROUTE_LABEL_CACHE[route_id] = (route, label)
+    return label
@@ -6,6 +6,17 @@ class BusinessValidationError(Exception):
 
     def __init__(self, message: str):
         super().__init__(message)
-        self.message = message
 
+    @property
+    def message(self) -> str:
+        # Read from `args` instead of storing an attribute, so raising doesn't materialize a
+        # per-instance `__dict__`.
+        return self.args[0]
 
+
+class PatientNotFoundError(Exception):
+    """Raised when a write references a patient that does not exist."""
+
+
+class PatientHasNotesError(Exception):
+    """Raised when deleting a patient that notes still reference (FK `ON DELETE RESTRICT`)."""
@@ -3,13 +3,17 @@ from __future__ import annotations
 from contextlib import asynccontextmanager
 from pathlib import Path
 
+import orjson
 from fastapi import FastAPI
 from fastapi.openapi.docs import get_redoc_html
+from fastapi.responses import ORJSONResponse
+from starlette.responses import HTMLResponse, Response
 from starlette.staticfiles import StaticFiles
 
 from app.api.exception_handlers import register_exception_handlers
 from app.api.schemas import HealthOut
-from app.core.db import close_db, init_db
+from app.core.db import close_db, init_db, warm_up_db
+from app.core.llm.deps import close_openai_client
 from app.core.logging import setup_logging
 from app.core.metrics import PrometheusMetricsMiddleware, metrics_router
 from app.core.middleware.http_logging import HttpLoggingMiddleware
@@ -18,6 +22,8 @@ from app.patients.router import router as patients_router
 
 setup_logging()
 
+_HEALTH_OK_BODY = HealthOut(status="ok").model_dump_json().encode("utf-8")
+
 
 def create_app() -> FastAPI:
     @asynccontextmanager
@@ -25,9 +31,25 @@ def create_app() -> FastAPI:
         # Defer settings/env access until application startup.
         # This avoids requiring DATABASE_URL at import time (e.g. during pytest collection in CI).
         settings = get_settings()
-        init_db(app=app, database_url=str(settings.database_url))
+        init_db(
+            app=app,
+            database_url=str(settings.database_url),
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_recycle=settings.db_pool_recycle_seconds,
+            pool_pre_ping=settings.db_pool_pre_ping,
+        )
+        await warm_up_db(
+            app=app,
+            connections=min(settings.db_pool_warm_connections, settings.db_pool_size),
+        )
+        if app.openapi_url:
+            # Build the schema (walks every route + model) before traffic, not on the first
+            # docs request.
+            _openapi_bytes(app)
         yield
         await close_db(app=app)
+        await close_openai_client()
 
     app = FastAPI(
         title="Healthcare Data Processing API",
@@ -40,6 +62,9 @@ def create_app() -> FastAPI:
             "- Logging and metrics avoid PHI/PII by using route templates and metadata only."
         ),
         lifespan=lifespan,
+        # Serialize response bodies with orjson (native UUID/datetime encoding in C) rather than
+        # stdlib json; payloads are still produced from the declared response models.
+        default_response_class=ORJSONResponse,
         docs_url="/swagger",  # Swagger UI ("Try it out")
         redoc_url=None,  # we'll serve a custom ReDoc page at /docs
         openapi_tags=[
@@ -75,19 +100,23 @@ def create_app() -> FastAPI:
     static_dir = Path(__file__).resolve().parent / "static"
     app.mount("/static", StaticFiles(directory=str(static_dir)), name="static")
 
+    # The page is static for the process lifetime: resolve the script source and render the
+    # HTML once instead of a stat() + template render per request.
+    local_redoc = static_dir / "redoc.standalone.js"
+    redoc_js_url = (
+        "/static/redoc.standalone.js"
+        if local_redoc.exists()
+        else ("https://cdn.jsdelivr.net/npm/redoc@2.1.4/bundles/redoc.standalone.js")
+    )
+    redoc_html = get_redoc_html(
+        openapi_url=app.openapi_url or "/openapi.json",
+        title=f"{app.title} - ReDoc",
+        redoc_js_url=redoc_js_url,
+    ).body
+
     @app.get("/docs", include_in_schema=False)
-    async def redoc_docs():
-        local_redoc = static_dir / "redoc.standalone.js"
-        redoc_js_url = (
-            "/static/redoc.standalone.js"
-            if local_redoc.exists()
-            else ("https://cdn.jsdelivr.net/npm/redoc@2.1.4/bundles/redoc.standalone.js")
-        )
-        return get_redoc_html(
-            openapi_url=app.openapi_url or "/openapi.json",
-            title=f"{app.title} - ReDoc",
-            redoc_js_url=redoc_js_url,
-        )
+    async def redoc_docs() -> HTMLResponse:
+        return HTMLResponse(content=redoc_html)
 
     @app.get(
         "/health",
@@ -100,12 +129,48 @@ def create_app() -> FastAPI:
             "can be used safely for basic uptime checks."
         ),
     )
-    async def health() -> HealthOut:
-        return HealthOut(status="ok")
+    async def health() -> Response:
+        # Probes hit this constantly: return pre-serialized bytes (schema still documented via
+        # `response_model`). A new Response per call because middleware appends to its headers.
+        return Response(content=_HEALTH_OK_BODY, media_type="application/json")
 
     app.include_router(metrics_router)
     app.include_router(patients_router)
+
+    _serve_cached_openapi(app)
     return app
 
 
+def _openapi_bytes(app: FastAPI) -> bytes:
+    """Return the serialized OpenAPI schema, building and caching it on first use."""
+
+    schema_bytes: bytes | None = getattr(app.state, "openapi_bytes", None)
+    if schema_bytes is None:
+        schema_bytes = orjson.dumps(app.openapi())
+        app.state.openapi_bytes = schema_bytes
+    return schema_bytes
+
+
+def _serve_cached_openapi(app: FastAPI) -> None:
+    """
+    Replace FastAPI's default schema route with one that serves pre-serialized bytes.
+
+    `app.openapi()` already caches the schema dict, but the default route re-serializes it to
+    JSON on every request (ReDoc/Swagger fetch it on every page load). The schema is fixed once
+    all routers are included, so it is serialized once (at startup, see `lifespan`) and reused.
+    """
+
+    openapi_url = app.openapi_url
+    if not openapi_url:
+        return
+
+    app.router.routes[:] = [
+        route for route in app.router.routes if getattr(route, "path", None) != openapi_url
+    ]
+
+    @app.get(openapi_url, include_in_schema=False)
+    async def openapi_json() -> Response:
+        return Response(content=_openapi_bytes(app), media_type="application/json")
+
+
 app = create_app()
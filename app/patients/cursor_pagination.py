@@ -1,10 +1,11 @@
 from __future__ import annotations
 
 import base64
-import json
 import uuid
 from dataclasses import dataclass
-from datetime import date, datetime
+from functools import lru_cache
+
+import orjson
 
 
 @dataclass(frozen=True)
@@ -21,9 +22,9 @@ def _b64url_encode(data: bytes) -> str:
 
 
 def _b64url_decode(data: str) -> bytes:
-    # Accept paddingless cursors too.
-    padded = data + "=" * (-len(data) % 4)
-    return base64.urlsafe_b64decode(padded.encode("ascii"))
+    # Accept paddingless cursors too. `urlsafe_b64decode` takes ASCII str directly (non-ASCII
+    # raises ValueError), so there is no separate `.encode()` round-trip.
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
 
 
 def encode_patient_cursor(
@@ -36,14 +37,15 @@ def encode_patient_cursor(
         "name": name,
         "last": {"id": str(last_id), "value": last_value},
     }
-    return _b64url_encode(
-        json.dumps(payload, separators=(",", ":"), sort_keys=True).encode("utf-8")
-    )
+    return _b64url_encode(orjson.dumps(payload, option=orjson.OPT_SORT_KEYS))
 
 
+# Cursors are immutable for a given (cursor, sort, order, name) and the result is a frozen
+# dataclass, so decoded cursors can be shared. Failures raise and are never cached.
+@lru_cache(maxsize=4096)
 def decode_patient_cursor(*, cursor: str, sort: str, order: str, name: str | None) -> PatientCursor:
     try:
-        payload = json.loads(_b64url_decode(cursor))
+        payload = orjson.loads(_b64url_decode(cursor))
     except Exception as exc:  # noqa: BLE001
         raise ValueError("Invalid cursor") from exc
 
@@ -60,17 +62,3 @@ def decode_patient_cursor(*, cursor: str, sort: str, order: str, name: str | Non
         raise ValueError("Invalid cursor payload")
 
     return PatientCursor(sort=sort, order=order, name=name, last_id=last_id, last_value=last_value)
-
-
-def parse_cursor_value(*, sort: str, raw: str) -> str | date | datetime:
-    if sort == "created_at":
-        return datetime.fromisoformat(raw)
-    if sort == "date_of_birth":
-        return date.fromisoformat(raw)
-    return raw
-
-
-def format_cursor_value(*, sort: str, value: str | date | datetime) -> str:
-    if isinstance(value, (date, datetime)):
-        return value.isoformat()
-    return str(value)
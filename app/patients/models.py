@@ -3,23 +3,41 @@ from __future__ import annotations
 import uuid
 from datetime import date, datetime
 
-from sqlalchemy import Date, DateTime, String, Uuid, func
+from sqlalchemy import Date, DateTime, Index, String, Uuid, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.core.db import Base
+from app.core.ids import new_id
 
 
 class Patient(Base):
     __tablename__ = "patients"
+    __table_args__ = (
+        # Uniqueness is enforced here only (no pre-insert lookup); see migration 0004.
+        Index("uq_patients_mrn", "mrn", unique=True),
+        # Keyset pagination indexes: one per sort key, with `id` as the tie-breaker; see
+        # migration 0009.
+        Index("ix_patients_name_id", "name", "id"),
+        Index("ix_patients_date_of_birth_id", "date_of_birth", "id"),
+        Index("ix_patients_created_at_id", "created_at", "id"),
+        # Serves case-insensitive substring search on name (ILIKE '%q%'); PostgreSQL + pg_trgm
+        # only, see migration 0008.
+        Index(
+            "ix_patients_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
 
-    id: Mapped[uuid.UUID] = mapped_column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id: Mapped[uuid.UUID] = mapped_column(Uuid(as_uuid=True), primary_key=True, default=new_id)
     # MRN (Medical Record Number) is a *domain identifier* (not a technical primary key).
     # - Nullable for backward compatibility (existing patients)
     # - Unique within the system
     # - Immutable once set (enforced in service layer + DB trigger in migration where possible)
     mrn: Mapped[str] = mapped_column(String(50), nullable=False)
-    name: Mapped[str] = mapped_column(String(255), nullable=False, index=True)
-    date_of_birth: Mapped[date] = mapped_column(Date, nullable=False, index=True)
+    name: Mapped[str] = mapped_column(String(255), nullable=False)
+    date_of_birth: Mapped[date] = mapped_column(Date, nullable=False)
 
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), nullable=False, server_default=func.now()
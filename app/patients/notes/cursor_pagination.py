@@ -1,11 +1,12 @@
 from __future__ import annotations
 
 import base64
-import json
 import uuid
 from dataclasses import dataclass
 from datetime import datetime
 
+import orjson
+
 
 @dataclass(frozen=True)
 class NoteCursor:
@@ -20,14 +21,14 @@ def encode_note_cursor(*, cursor: NoteCursor) -> str:
         "last_taken_at": cursor.last_taken_at.isoformat(),
         "last_id": str(cursor.last_id),
     }
-    raw = json.dumps(payload, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    raw = orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)
     return base64.urlsafe_b64encode(raw).decode("ascii")
 
 
 def decode_note_cursor(*, raw: str) -> NoteCursor:
     try:
-        decoded = base64.urlsafe_b64decode(raw.encode("ascii"))
-        obj = json.loads(decoded.decode("utf-8"))
+        decoded = base64.urlsafe_b64decode(raw)
+        obj = orjson.loads(decoded)
         return NoteCursor(
             patient_id=uuid.UUID(obj["patient_id"]),
             last_taken_at=datetime.fromisoformat(obj["last_taken_at"]),
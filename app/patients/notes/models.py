@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import uuid
 from datetime import datetime
+from typing import Any
 
 from sqlalchemy import (
     JSON,
@@ -9,15 +10,35 @@ from sqlalchemy import (
     CheckConstraint,
     DateTime,
     ForeignKey,
+    Index,
     String,
     Text,
     UniqueConstraint,
     Uuid,
     func,
+    text,
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.db import Base
+from app.core.ids import new_id
+
+
+def structured_data_payload(*, data: Any, schema: str) -> dict[str, Any]:
+    """
+    Shape a persisted `PatientNoteStructured` row for API responses / prompts.
+
+    Keeps the contract stable and minimal: schema + derived marker + sections.
+    """
+
+    payload = data or {}
+    schema_from_payload = payload.get("schema") if isinstance(payload, dict) else None
+    sections = payload.get("sections") if isinstance(payload, dict) else None
+    return {
+        "schema": schema_from_payload or schema,
+        "derived": True,
+        "sections": sections if isinstance(sections, dict) else {},
+    }
 
 
 class PatientNote(Base):
@@ -32,30 +53,29 @@ class PatientNote(Base):
 
     __tablename__ = "patient_notes"
     __table_args__ = (
-        # Must have at least one storage backing (inline text or file reference).
+        # Content rules, fused into one CHECK so each write evaluates a single predicate:
+        # - Exactly one storage backing: inline text XOR file reference (no ambiguous precedence).
+        # - Basic hardening: local file paths must be relative and not contain traversal.
+        #   (Application should also enforce this.)
+        # - If provided, checksum should look like a 64-char sha256 hex string.
         CheckConstraint(
-            "(content_text IS NOT NULL) OR (file_path IS NOT NULL)",
-            name="patient_notes_has_content",
+            "((content_text IS NOT NULL) != (file_path IS NOT NULL)) "
+            "AND ((file_path IS NULL) OR (file_path NOT LIKE '/%' AND file_path NOT LIKE '%..%')) "
+            "AND ((checksum_sha256 IS NULL) OR (length(checksum_sha256) = 64))",
+            name="patient_notes_content_rules",
         ),
-        # Enforce "either-or" for clarity and auditability (no ambiguous precedence).
-        CheckConstraint(
-            "NOT (content_text IS NOT NULL AND file_path IS NOT NULL)",
-            name="patient_notes_content_xor_file",
-        ),
-        # Basic hardening: local file paths must be relative and not contain traversal.
-        # (Application should also enforce this.)
-        CheckConstraint(
-            "(file_path IS NULL) OR (file_path NOT LIKE '/%' AND file_path NOT LIKE '%..%')",
-            name="patient_notes_file_path_relative",
-        ),
-        # If provided, checksum should look like a 64-char sha256 hex string.
-        CheckConstraint(
-            "(checksum_sha256 IS NULL) OR (length(checksum_sha256) = 64)",
-            name="patient_notes_checksum_len_64",
+        # Timeline reads only ever touch live notes; index just those (partial index).
+        Index(
+            "ix_patient_notes_active_patient_id_taken_at",
+            "patient_id",
+            "taken_at",
+            "id",
+            postgresql_where=text("deleted_at IS NULL"),
+            sqlite_where=text("deleted_at IS NULL"),
         ),
     )
 
-    id: Mapped[uuid.UUID] = mapped_column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id: Mapped[uuid.UUID] = mapped_column(Uuid(as_uuid=True), primary_key=True, default=new_id)
 
     patient_id: Mapped[uuid.UUID] = mapped_column(
         Uuid(as_uuid=True),
@@ -124,28 +144,15 @@ class PatientNote(Base):
         # The table allows multiple schemas per note over time; the API exposes a single
         # best candidate. Prefer the most recently updated row to avoid surprising callers.
         best = max(self.structured, key=lambda r: (r.updated_at, r.created_at))
-        payload = best.data or {}
-
-        schema = payload.get("schema") if isinstance(payload, dict) else None
-        sections = None
-        if isinstance(payload, dict):
-            sections = payload.get("sections")
-
-        # Keep the response contract stable and minimal: schema + derived marker + sections.
-        sections_dict = sections if isinstance(sections, dict) else {}
-        return {
-            "schema": schema or best.schema,
-            "derived": True,
-            "sections": sections_dict,
-        }
+        return structured_data_payload(data=best.data, schema=best.schema)
 
     @property
     def has_structured_data(self) -> bool:
         """
         True if this note has any persisted derived structured rows.
 
-        This is safe for list endpoints: it is a cheap boolean derived from already-loaded
-        ORM relationships (prefetched via selectinload) and does not parse/infer anything.
+        A cheap boolean derived from the already-loaded relationship; it does not parse/infer
+        anything. (List endpoints compute the same flag in SQL, see `list_patient_notes`.)
         """
 
         return bool(self.structured)
@@ -201,7 +208,7 @@ class PatientNoteStructured(Base):
         UniqueConstraint("note_id", "schema", name="patient_note_structured_note_schema_unique"),
     )
 
-    id: Mapped[uuid.UUID] = mapped_column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id: Mapped[uuid.UUID] = mapped_column(Uuid(as_uuid=True), primary_key=True, default=new_id)
 
     note_id: Mapped[uuid.UUID] = mapped_column(
         Uuid(as_uuid=True),
@@ -1,28 +1,34 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 import mimetypes
 import uuid
 from datetime import UTC, datetime
+from functools import lru_cache
 from pathlib import Path
+from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.encoders import jsonable_encoder
 from pydantic import TypeAdapter, ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.db import get_session
-from app.core.settings import get_settings
-from app.domain.exceptions import BusinessValidationError
+from app.core.ids import new_id
+from app.core.settings import Settings, get_settings
+from app.domain.exceptions import BusinessValidationError, PatientNotFoundError
+from app.patients.notes.models import PatientNote
 from app.patients.notes.schemas import PatientNoteCreateJson, PatientNoteListOut, PatientNoteOut
 from app.patients.notes.service import (
     create_file_patient_note,
     create_inline_patient_note,
-    get_patient_note,
+    get_patient_note_with_patient_check,
     list_patient_notes,
     soft_delete_patient_note,
 )
 from app.patients.notes.storage import LocalFileStorage, PayloadTooLargeError, StorageIOError
-from app.patients.service import get_patient
+from app.patients.service import patient_exists
 
 router = APIRouter(prefix="/{patient_id}/notes", tags=["patient-notes"])
 logger = logging.getLogger("app.soap")
@@ -69,6 +75,76 @@ _CREATE_NOTE_OPENAPI_EXTRA = {
 }
 
 
+# Allowance for multipart framing and the small form fields next to the file (taken_at,
+# note_type) when comparing a request's Content-Length against the upload limit.
+_MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+# Built once: constructing a TypeAdapter compiles a validator.
+_DATETIME_ADAPTER: TypeAdapter[datetime] = TypeAdapter(datetime)
+
+# Magic-byte signatures for binary note formats (PDF first: the most common clinical upload).
+_MAGIC_SIGNATURES: tuple[tuple[bytes, str], ...] = (
+    (b"%PDF-", "application/pdf"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+)
+_MAGIC_BY_FIRST_BYTE: dict[int, tuple[bytes, str]] = {
+    signature[0]: (signature, mime_type) for signature, mime_type in _MAGIC_SIGNATURES
+}
+_SNIFFABLE_MIME_TYPES = frozenset(mime_type for _, mime_type in _MAGIC_SIGNATURES)
+# Only read as much of the upload as the longest signature needs.
+_SNIFF_HEAD_BYTES = max(len(signature) for signature, _ in _MAGIC_SIGNATURES)
+
+
+@lru_cache(maxsize=4)
+def _get_local_storage(*, base_dir: str) -> LocalFileStorage:
+    # Storage is stateless apart from its (resolved) base dir; reuse one per configured path.
+    return LocalFileStorage(base_dir=Path(base_dir))
+
+
+def _note_list_item_out(row: dict[str, Any]) -> PatientNoteListOut.PatientNoteListItemOut:
+    """
+    Build a list item from a `list_patient_notes` row without re-validating it.
+
+    Column types are enforced by the DB schema; only the two SQL-computed flags are normalized
+    (some backends return them as 0/1).
+    """
+
+    return PatientNoteListOut.PatientNoteListItemOut.model_construct(
+        **{
+            **row,
+            "has_file": bool(row["has_file"]),
+            "has_structured_data": bool(row["has_structured_data"]),
+        }
+    )
+
+
+def _created_note_out(note: PatientNote) -> PatientNoteOut:
+    """
+    Build the response for a note created in this request, without re-validating it.
+
+    Every field was set (or returned by the INSERT) in-process, so skip validation and never touch
+    the note's relationships, which are not loaded on a freshly inserted note. The create
+    response does not embed derived structured data; it is exposed via `GET /{note_id}`.
+    """
+
+    return PatientNoteOut.model_construct(
+        id=note.id,
+        patient_id=note.patient_id,
+        taken_at=note.taken_at,
+        note_type=note.note_type,
+        has_file=note.file_path is not None,
+        content_text=note.content_text,
+        content_mime_type=note.content_mime_type,
+        file_size_bytes=note.file_size_bytes,
+        checksum_sha256=note.checksum_sha256,
+        structured_data=None,
+        created_at=note.created_at,
+        updated_at=note.updated_at,
+        deleted_at=note.deleted_at,
+    )
+
+
 def _sniff_mime_type(upload) -> str | None:
     """
     Best-effort MIME detection without external deps.
@@ -83,17 +159,15 @@ def _sniff_mime_type(upload) -> str | None:
         pos = f.tell()
         # Ensure we read from the start; form parsers may leave the cursor at EOF.
         f.seek(0)
-        head = f.read(16)
+        head = f.read(_SNIFF_HEAD_BYTES)
         f.seek(pos)
     except Exception:  # noqa: BLE001
         head = b""
 
-    if head.startswith(b"%PDF-"):
-        return "application/pdf"
-    if head.startswith(b"\x89PNG\r\n\x1a\n"):
-        return "image/png"
-    if head.startswith(b"\xff\xd8\xff"):
-        return "image/jpeg"
+    # Signatures have distinct first bytes, so at most one prefix compare per upload.
+    candidate = _MAGIC_BY_FIRST_BYTE.get(head[0]) if head else None
+    if candidate is not None and head.startswith(candidate[0]):
+        return candidate[1]
 
     # Fallback to extension-based guess (still safe; don't log it).
     filename = getattr(upload, "filename", None)
@@ -104,18 +178,24 @@ def _sniff_mime_type(upload) -> str | None:
     return None
 
 
-def _determine_allowed_mime_type(*, upload, allowed: set[str]) -> str:
+def _normalize_mime_type(value: str | None) -> str:
+    return value.strip().lower() if value else ""
+
+
+def _determine_allowed_mime_type(*, upload, allowed: frozenset[str]) -> str:
     """
     Determine MIME type for an upload, preferring reliable values,
     while enforcing the allowlist.
     """
 
-    sniffed = (_sniff_mime_type(upload) or "").lower().strip()
+    # Sniffed values come from our signature table or `mimetypes`, both already canonical
+    # (lowercase, no whitespace); only the client-provided header needs normalizing.
+    sniffed = _sniff_mime_type(upload) or ""
+    provided = _normalize_mime_type(getattr(upload, "content_type", None))
     if sniffed in allowed:
         # If we can confidently identify a binary format, prefer sniffing even if the client
         # claimed a different (but still allowed) type like text/plain.
-        provided = (getattr(upload, "content_type", None) or "").lower().strip()
-        if sniffed in {"application/pdf", "image/png", "image/jpeg"} and provided != sniffed:
+        if sniffed in _SNIFFABLE_MIME_TYPES and provided != sniffed:
             return sniffed
 
         # Otherwise prefer the provided value (if allowed) to avoid surprising callers.
@@ -123,7 +203,6 @@ def _determine_allowed_mime_type(*, upload, allowed: set[str]) -> str:
             return provided
         return sniffed
 
-    provided = (getattr(upload, "content_type", None) or "").lower().strip()
     if provided in allowed:
         return provided
 
@@ -152,25 +231,34 @@ async def list_notes(
         default=None, description="Cursor for pagination (use `next_cursor` from previous response)."
     ),
     session: AsyncSession = Depends(get_session),
-) -> PatientNoteListOut:
-    patient = await get_patient(session=session, patient_id=patient_id)
-    if patient is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Patient not found")
-
+) -> Response:
+    # Notes reference their patient (FK), so a non-empty page already proves the patient
+    # exists; only fall back to the existence check (extra round-trip) when nothing came back.
     try:
         items, next_cursor = await list_patient_notes(
             session=session, patient_id=patient_id, limit=limit, cursor=cursor
         )
     except ValueError as exc:
+        if not await patient_exists(session=session, patient_id=patient_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Patient not found"
+            ) from exc
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
 
-    return PatientNoteListOut(
+    if not items and not await patient_exists(session=session, patient_id=patient_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Patient not found")
+
+    page = PatientNoteListOut(
         # List items intentionally do not embed the full derived structured payload.
         # Instead they include `has_structured_data`; callers can fetch details via GET /{note_id}.
-        items=[PatientNoteListOut.PatientNoteListItemOut.model_validate(n) for n in items],
+        items=[_note_list_item_out(row) for row in items],
         limit=limit,
         next_cursor=next_cursor,
     )
+    # Serialize straight from the model's prebuilt serializer. Returning the model would make
+    # FastAPI dump it, re-validate it against `response_model` and encode it again; the
+    # decorator's `response_model` still documents the shape.
+    return Response(content=page.model_dump_json(), media_type="application/json")
 
 
 @router.get(
@@ -198,17 +286,168 @@ async def get_note(
     (non-authoritative) when it exists; otherwise `structured_data` is null.
     """
 
-    patient = await get_patient(session=session, patient_id=patient_id)
-    if patient is None:
+    found_patient, note = await get_patient_note_with_patient_check(
+        session=session, patient_id=patient_id, note_id=note_id
+    )
+    if not found_patient:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Patient not found")
-
-    note = await get_patient_note(session=session, patient_id=patient_id, note_id=note_id)
     if note is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Note not found")
 
     return PatientNoteOut.model_validate(note)
 
 
+async def _handle_inline_json(
+    *, request: Request, session: AsyncSession, patient_id: uuid.UUID
+) -> PatientNoteOut:
+    try:
+        # Parse + validate in one pass inside pydantic-core; malformed JSON surfaces as a
+        # `json_invalid` validation error (422) instead of an unhandled decode error.
+        payload = PatientNoteCreateJson.model_validate_json(await request.body())
+    except ValidationError as exc:
+        # JSON-mode errors can carry raw `bytes` input; encode like FastAPI's own handler.
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=jsonable_encoder(exc.errors()),
+        ) from exc
+
+    try:
+        note = await create_inline_patient_note(
+            session=session,
+            patient_id=patient_id,
+            taken_at=payload.taken_at,
+            note_type=payload.note_type,
+            content_text=payload.content_text,
+            content_mime_type=payload.content_mime_type,
+        )
+    except PatientNotFoundError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Patient not found"
+        ) from exc
+    except BusinessValidationError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=exc.message) from exc
+
+    return _created_note_out(note)
+
+
+async def _handle_multipart(
+    *, request: Request, session: AsyncSession, patient_id: uuid.UUID, settings: Settings
+) -> PatientNoteOut:
+    # Check the patient before reading the body: an upload for an unknown patient must not be
+    # spooled and fsynced to disk only to be rejected, and 404 takes precedence over 4xx errors
+    # about the payload. The FK check at commit still covers a concurrent patient delete.
+    if not await patient_exists(session=session, patient_id=patient_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Patient not found")
+
+    # Starlette spools the whole multipart body before handing us the form, so an oversized
+    # upload would be buffered in full only to fail the size check in storage. When the client
+    # declares a body length that cannot fit, reject it before reading anything.
+    max_bytes = settings.notes_max_upload_bytes
+    content_length = request.headers.get("content-length")
+    if (
+        content_length is not None
+        and content_length.isdigit()
+        and int(content_length) > max_bytes + _MULTIPART_OVERHEAD_BYTES
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="Uploaded file is too large",
+        )
+
+    # NOTE: multipart parsing requires python-multipart.
+    form = await request.form()
+    upload = form.get("file")
+    if upload is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="file is required for multipart requests",
+        )
+
+    # Starlette returns UploadFile here; type is runtime-checked by usage below.
+    taken_at_raw = form.get("taken_at")
+    if taken_at_raw is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="taken_at is required")
+
+    try:
+        taken_at = _DATETIME_ADAPTER.validate_python(taken_at_raw)
+    except ValidationError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=exc.errors()
+        ) from exc
+
+    note_type_raw = form.get("note_type")
+    note_type = str(note_type_raw) if note_type_raw is not None else None
+
+    allowed = settings.notes_allowed_mime_types_set
+    mime_type = _determine_allowed_mime_type(upload=upload, allowed=allowed)
+    if mime_type not in allowed:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Unsupported media type: {mime_type}",
+        )
+
+    note_id = new_id()
+    if settings.file_storage_backend != "local":
+        raise HTTPException(status_code=500, detail="File storage backend is not supported")
+
+    storage = _get_local_storage(base_dir=settings.local_storage_base_path)
+
+    # Best-effort SOAP parsing requires raw text. For file-backed notes we only attempt
+    # this for text/plain uploads; parsing is deterministic and must never block creation.
+    # The bytes are captured while storage streams the upload, so the file is read once.
+    parse_soap_text = (note_type or "").strip().lower() == "soap" and mime_type == "text/plain"
+
+    try:
+        stored = await storage.save(
+            patient_id=patient_id,
+            note_id=note_id,
+            upload=upload,
+            max_bytes=max_bytes,
+            capture_content=parse_soap_text,
+        )
+    except PayloadTooLargeError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="Uploaded file is too large",
+        ) from exc
+    except StorageIOError as exc:
+        raise HTTPException(status_code=500, detail="File storage failed") from exc
+
+    raw_text_for_parsing: str | None = None
+    if stored.content is not None:
+        try:
+            raw_text_for_parsing = stored.content.decode("utf-8")
+        except UnicodeDecodeError:
+            # Deterministic fallback; do not log content/filenames.
+            raw_text_for_parsing = stored.content.decode("utf-8", errors="replace")
+            logger.warning("SOAP decode used replacement characters (note_id=%s)", str(note_id))
+
+    # Persist DB record after file write; if DB fails, delete the file (best-effort).
+    try:
+        note = await create_file_patient_note(
+            session=session,
+            patient_id=patient_id,
+            note_id=note_id,
+            taken_at=taken_at,
+            note_type=note_type,
+            content_mime_type=mime_type,
+            stored_file=stored,
+            raw_text_for_parsing=raw_text_for_parsing,
+        )
+    except Exception as exc:
+        try:
+            await storage.delete(key=stored.key)
+        except Exception:  # noqa: BLE001
+            pass
+        if isinstance(exc, PatientNotFoundError):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Patient not found"
+            ) from exc
+        raise
+
+    return _created_note_out(note)
+
+
 @router.post(
     "",
     status_code=status.HTTP_201_CREATED,
@@ -236,140 +475,16 @@ async def create_patient_note(
     request: Request,
     session: AsyncSession = Depends(get_session),
 ) -> PatientNoteOut:
-    patient = await get_patient(session=session, patient_id=patient_id)
-    if patient is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Patient not found")
-
-    content_type = (request.headers.get("content-type") or "").lower()
-    settings = get_settings()
-
-    # Support either JSON (inline text) or multipart/form-data (file upload).
-    if content_type.startswith("application/json"):
-        try:
-            raw = await request.json()
-            payload = PatientNoteCreateJson.model_validate(raw)
-        except ValidationError as exc:
-            raise HTTPException(
-                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=exc.errors()
-            ) from exc
-
-        try:
-            note = await create_inline_patient_note(
-                session=session,
-                patient=patient,
-                taken_at=payload.taken_at,
-                note_type=payload.note_type,
-                content_text=payload.content_text,
-                content_mime_type=payload.content_mime_type,
-            )
-        except BusinessValidationError as exc:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST, detail=exc.message
-            ) from exc
-
-        return PatientNoteOut.model_validate(note)
-
-    if content_type.startswith("multipart/form-data"):
-        # NOTE: multipart parsing requires python-multipart.
-        form = await request.form()
-        upload = form.get("file")
-        if upload is None:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="file is required for multipart requests",
-            )
-
-        # Starlette returns UploadFile here; type is runtime-checked by usage below.
-        taken_at_raw = form.get("taken_at")
-        if taken_at_raw is None:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST, detail="taken_at is required"
-            )
-
-        try:
-            taken_at = TypeAdapter(datetime).validate_python(taken_at_raw)
-        except ValidationError as exc:
-            raise HTTPException(
-                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=exc.errors()
-            ) from exc
-
-        note_type_raw = form.get("note_type")
-        note_type = str(note_type_raw) if note_type_raw is not None else None
-
-        allowed = set(settings.notes_allowed_mime_types)
-        mime_type = _determine_allowed_mime_type(upload=upload, allowed=allowed)
-        if mime_type not in allowed:
-            raise HTTPException(
-                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
-                detail=f"Unsupported media type: {mime_type}",
-            )
-
-        note_id = uuid.uuid4()
-        if settings.file_storage_backend != "local":
-            raise HTTPException(status_code=500, detail="File storage backend is not supported")
-
-        storage = LocalFileStorage(base_dir=Path(settings.local_storage_base_path))
-        max_bytes = int(settings.max_note_upload_mb) * 1024 * 1024
-
-        # Best-effort SOAP parsing requires raw text. For file-backed notes we only attempt
-        # this for text/plain uploads; parsing is deterministic and must never block creation.
-        raw_text_for_parsing: str | None = None
-        if (note_type or "").strip().lower() == "soap" and mime_type == "text/plain":
-            try:
-                f = getattr(upload, "file", None)
-                if f is not None:
-                    f.seek(0)
-                    raw_bytes = f.read()
-                    f.seek(0)
-                    try:
-                        raw_text_for_parsing = raw_bytes.decode("utf-8")
-                    except UnicodeDecodeError:
-                        # Deterministic fallback; do not log content/filenames.
-                        raw_text_for_parsing = raw_bytes.decode("utf-8", errors="replace")
-                        logger.warning(
-                            "SOAP decode used replacement characters (note_id=%s)", str(note_id)
-                        )
-            except Exception as exc:  # noqa: BLE001
-                logger.warning(
-                    "SOAP pre-parse read failed; continuing without derived parse (error=%s)",
-                    exc.__class__.__name__,
-                )
-
-        try:
-            stored = await storage.save(
-                patient_id=patient.id,
-                note_id=note_id,
-                upload=upload,
-                max_bytes=max_bytes,
-            )
-        except PayloadTooLargeError as exc:
-            raise HTTPException(
-                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                detail="Uploaded file is too large",
-            ) from exc
-        except StorageIOError as exc:
-            raise HTTPException(status_code=500, detail="File storage failed") from exc
-
-        # Persist DB record after file write; if DB fails, delete the file (best-effort).
-        try:
-            note = await create_file_patient_note(
-                session=session,
-                patient=patient,
-                note_id=note_id,
-                taken_at=taken_at,
-                note_type=note_type,
-                content_mime_type=mime_type,
-                stored_file=stored,
-                raw_text_for_parsing=raw_text_for_parsing,
-            )
-        except Exception:
-            try:
-                await storage.delete(key=stored.key)
-            except Exception:  # noqa: BLE001
-                pass
-            raise
-
-        return PatientNoteOut.model_validate(note)
+    # Support either JSON (inline text) or multipart/form-data (file upload), dispatched on the
+    # media type without its parameters (charset, boundary).
+    content_type = request.headers.get("content-type") or ""
+    media_type = content_type.partition(";")[0].strip().lower()
+    if media_type == "application/json":
+        return await _handle_inline_json(request=request, session=session, patient_id=patient_id)
+    if media_type == "multipart/form-data":
+        return await _handle_multipart(
+            request=request, session=session, patient_id=patient_id, settings=get_settings()
+        )
 
     raise HTTPException(
         status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
@@ -396,24 +511,28 @@ async def delete_note(
     note_id: uuid.UUID,
     session: AsyncSession = Depends(get_session),
 ) -> None:
-    patient = await get_patient(session=session, patient_id=patient_id)
-    if patient is None:
+    found_patient, note = await get_patient_note_with_patient_check(
+        session=session, patient_id=patient_id, note_id=note_id
+    )
+    if not found_patient:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Patient not found")
-
-    note = await get_patient_note(session=session, patient_id=patient_id, note_id=note_id)
     if note is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Note not found")
 
     # Soft delete for auditability. Ensure file is removed so DB "deleted" implies content is gone.
+    # The file removal runs alongside the DB UPDATE; the delete is only committed once it succeeded.
     settings = get_settings()
+    file_delete: asyncio.Task[None] | None = None
     if note.file_path:
         if settings.file_storage_backend != "local":
             raise HTTPException(status_code=500, detail="File storage backend is not supported")
-        storage = LocalFileStorage(base_dir=Path(settings.local_storage_base_path))
-        try:
-            await storage.delete(key=note.file_path)
-        except StorageIOError as exc:
-            raise HTTPException(status_code=500, detail="File deletion failed") from exc
+        storage = _get_local_storage(base_dir=settings.local_storage_base_path)
+        file_delete = asyncio.create_task(storage.delete(key=note.file_path))
 
-    await soft_delete_patient_note(session=session, note=note, deleted_at=datetime.now(UTC))
+    try:
+        await soft_delete_patient_note(
+            session=session, note=note, deleted_at=datetime.now(UTC), file_delete=file_delete
+        )
+    except StorageIOError as exc:
+        raise HTTPException(status_code=500, detail="File deletion failed") from exc
     return None
@@ -1,20 +1,24 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 import uuid
 from datetime import UTC, datetime
+from typing import Any
 
-from sqlalchemy import Select, and_, or_, select
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy import Integer, and_, bindparam, exists, select, tuple_
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.domain.exceptions import BusinessValidationError
+from app.core.ids import new_id
+from app.domain.exceptions import BusinessValidationError, PatientNotFoundError
 from app.patients.models import Patient
 from app.patients.notes.cursor_pagination import NoteCursor, decode_note_cursor, encode_note_cursor
 from app.patients.notes.models import PatientNote, PatientNoteStructured
 from app.patients.notes.soap_parser import parse_soap
 from app.patients.notes.storage import StoredFile
+from app.patients.service import patient_exists
 
 logger = logging.getLogger("app.soap")
 
@@ -32,26 +36,30 @@ def _validate_taken_at_not_future(*, taken_at: datetime) -> None:
         raise BusinessValidationError("taken_at must not be in the future.")
 
 
-async def _maybe_parse_and_persist_soap(
+def _is_soap_note_type(note_type: str | None) -> bool:
+    # Checked by the create paths so non-SOAP notes (the common case) skip the parser entirely.
+    return note_type is not None and note_type.strip().lower() == "soap"
+
+
+def _build_soap_structured_row(
     *,
-    session: AsyncSession,
     note: PatientNote,
     raw_text: str | None,
-) -> None:
+) -> PatientNoteStructured | None:
     """
-    Best-effort SOAP parsing + persistence of derived structured data.
+    Best-effort SOAP parsing into a derived structured row for a new note.
 
-    - Only runs when note.note_type == "soap" (case-insensitive).
+    - Only called for SOAP notes (see `_is_soap_note_type`).
     - Never raises to callers (source-of-truth note must be persisted regardless).
     - Never logs note content or other PHI; warnings include only non-PHI metadata.
-    """
 
-    if (note.note_type or "").strip().lower() != "soap":
-        return
+    The row is returned unsaved so it is inserted in the same transaction as the note itself
+    (see `_commit_new_note`, which drops it rather than fail the note if its insert fails).
+    """
 
     if not raw_text:
         logger.warning("SOAP parse skipped: missing raw text (note_id=%s)", str(note.id))
-        return
+        return None
 
     try:
         parsed = parse_soap(raw_text)
@@ -62,11 +70,11 @@ async def _maybe_parse_and_persist_soap(
             str(note.id),
             exc.__class__.__name__,
         )
-        return
+        return None
 
     if parsed is None:
         logger.warning("SOAP parse failed: no SOAP markers found (note_id=%s)", str(note.id))
-        return
+        return None
 
     if parsed.confidence != "high":
         # Per requirements: log warning for incomplete parsing.
@@ -82,34 +90,57 @@ async def _maybe_parse_and_persist_soap(
         "sections": parsed.sections,
     }
 
+    return PatientNoteStructured(
+        id=new_id(),
+        note_id=note.id,
+        schema=parsed.schema,
+        parsed_from=parsed.parsed_from,
+        parser_version=parsed.parser_version,
+        confidence=parsed.confidence,
+        data=payload,
+    )
+
+
+async def _commit_new_note(
+    *,
+    session: AsyncSession,
+    patient_id: uuid.UUID,
+    structured: PatientNoteStructured | None = None,
+) -> None:
+    """
+    Commit a pending note insert, relying on the patient FK instead of a prior existence query.
+
+    An unknown patient surfaces as an FK violation; only on that (rare) failure path do we look
+    the patient up, to tell "patient not found" apart from other integrity errors.
+
+    A derived `structured` row is inserted under a SAVEPOINT after the note, so a failure there
+    drops only the derived row and the note is still committed.
+    """
+
     try:
-        row = PatientNoteStructured(
-            id=uuid.uuid4(),
-            note_id=note.id,
-            schema=parsed.schema,
-            parsed_from=parsed.parsed_from,
-            parser_version=parsed.parser_version,
-            confidence=parsed.confidence,
-            data=payload,
-        )
-        session.add(row)
+        if structured is not None:
+            await session.flush()
+            try:
+                async with session.begin_nested():
+                    session.add(structured)
+            except SQLAlchemyError as exc:
+                logger.warning(
+                    "SOAP structured row dropped: insert failed (note_id=%s, error=%s)",
+                    str(structured.note_id),
+                    exc.__class__.__name__,
+                )
         await session.commit()
-    except IntegrityError:
-        # Deterministic + idempotent behavior: if the row already exists, do nothing.
+    except IntegrityError as exc:
         await session.rollback()
-    except Exception as exc:  # noqa: BLE001
-        await session.rollback()
-        logger.warning(
-            "SOAP parse persistence failed (note_id=%s, error=%s)",
-            str(note.id),
-            exc.__class__.__name__,
-        )
+        if not await patient_exists(session=session, patient_id=patient_id):
+            raise PatientNotFoundError("Patient not found") from exc
+        raise
 
 
 async def create_inline_patient_note(
     *,
     session: AsyncSession,
-    patient: Patient,
+    patient_id: uuid.UUID,
     taken_at: datetime,
     note_type: str | None,
     content_text: str,
@@ -119,8 +150,8 @@ async def create_inline_patient_note(
     _validate_taken_at_not_future(taken_at=taken_at)
 
     note = PatientNote(
-        id=uuid.uuid4(),
-        patient_id=patient.id,
+        id=new_id(),
+        patient_id=patient_id,
         taken_at=taken_at,
         note_type=note_type,
         content_text=content_text,
@@ -131,11 +162,14 @@ async def create_inline_patient_note(
         deleted_at=None,
     )
     session.add(note)
-    await session.commit()
-    await session.refresh(note)
-
-    # Best-effort derived parsing (non-authoritative, source-of-truth remains content_text).
-    await _maybe_parse_and_persist_soap(session=session, note=note, raw_text=content_text)
+    # Best-effort derived parsing (non-authoritative, source-of-truth remains content_text),
+    # committed together with the note.
+    structured = None
+    if _is_soap_note_type(note_type):
+        structured = _build_soap_structured_row(note=note, raw_text=content_text)
+    # No refresh: server defaults (created_at/updated_at) come back via INSERT ... RETURNING
+    # and every other column was set here.
+    await _commit_new_note(session=session, patient_id=patient_id, structured=structured)
 
     return note
 
@@ -143,7 +177,7 @@ async def create_inline_patient_note(
 async def create_file_patient_note(
     *,
     session: AsyncSession,
-    patient: Patient,
+    patient_id: uuid.UUID,
     note_id: uuid.UUID,
     taken_at: datetime,
     note_type: str | None,
@@ -156,7 +190,7 @@ async def create_file_patient_note(
 
     note = PatientNote(
         id=note_id,
-        patient_id=patient.id,
+        patient_id=patient_id,
         taken_at=taken_at,
         note_type=note_type,
         content_text=None,
@@ -168,35 +202,62 @@ async def create_file_patient_note(
     )
 
     session.add(note)
-    await session.commit()
-    await session.refresh(note)
-
     # Best-effort derived parsing (non-authoritative, source-of-truth remains the file).
-    await _maybe_parse_and_persist_soap(session=session, note=note, raw_text=raw_text_for_parsing)
+    structured = None
+    if _is_soap_note_type(note_type):
+        structured = _build_soap_structured_row(note=note, raw_text=raw_text_for_parsing)
+    await _commit_new_note(session=session, patient_id=patient_id, structured=structured)
 
     return note
 
 
-def _apply_notes_cursor(
-    *,
-    stmt: Select[tuple[PatientNote]],
-    patient_id: uuid.UUID,
-    cursor: str | None,
-) -> Select[tuple[PatientNote]]:
+def _decode_notes_cursor(*, patient_id: uuid.UUID, cursor: str | None) -> NoteCursor | None:
     if not cursor:
-        return stmt
+        return None
 
     decoded = decode_note_cursor(raw=cursor)
     if decoded.patient_id != patient_id:
         raise ValueError("Invalid cursor")
-
+    return decoded
+
+
+# List pages only need note columns plus two flags, so they are read as plain column rows: no
+# ORM entities (and their eager-loaded patient / extracted text / structured payloads) per note.
+_NOTE_LIST_COLUMNS = (
+    PatientNote.id,
+    PatientNote.patient_id,
+    PatientNote.taken_at,
+    PatientNote.note_type,
+    PatientNote.content_text,
+    PatientNote.content_mime_type,
+    PatientNote.file_size_bytes,
+    PatientNote.checksum_sha256,
+    PatientNote.created_at,
+    PatientNote.updated_at,
+    PatientNote.deleted_at,
+    PatientNote.file_path.is_not(None).label("has_file"),
+    exists().where(PatientNoteStructured.note_id == PatientNote.id).label("has_structured_data"),
+)
+
+# The list query has only two shapes (first page / after a cursor), so both are built once with
+# bind parameters. Rebuilding the Select and its cache key per call cost ~200us; executing a
+# prebuilt statement reuses its memoized cache key and the compiled SQL.
+_LIST_NOTES_FIRST_PAGE = (
+    select(*_NOTE_LIST_COLUMNS)
+    .where(PatientNote.patient_id == bindparam("patient_id"), PatientNote.deleted_at.is_(None))
     # Default sort is taken_at DESC, tie-breaker id DESC.
-    return stmt.where(
-        or_(
-            PatientNote.taken_at < decoded.last_taken_at,
-            and_(PatientNote.taken_at == decoded.last_taken_at, PatientNote.id < decoded.last_id),
-        )
+    .order_by(PatientNote.taken_at.desc(), PatientNote.id.desc())
+    .limit(bindparam("limit", type_=Integer))
+)
+# A row-value comparison lets the planner start a single range scan on the
+# (patient_id, taken_at, id) index right at the cursor.
+_LIST_NOTES_AFTER_CURSOR = _LIST_NOTES_FIRST_PAGE.where(
+    tuple_(PatientNote.taken_at, PatientNote.id)
+    < tuple_(
+        bindparam("last_taken_at", type_=PatientNote.taken_at.type),
+        bindparam("last_id", type_=PatientNote.id.type),
     )
+)
 
 
 async def list_patient_notes(
@@ -205,19 +266,25 @@ async def list_patient_notes(
     patient_id: uuid.UUID,
     limit: int,
     cursor: str | None,
-) -> tuple[list[PatientNote], str | None]:
-    stmt = select(PatientNote).where(
-        PatientNote.patient_id == patient_id, PatientNote.deleted_at.is_(None)
-    )
-    # Prefetch derived structured rows efficiently to avoid per-note queries (N+1).
-    stmt = stmt.options(selectinload(PatientNote.structured))
-    stmt = stmt.order_by(PatientNote.taken_at.desc(), PatientNote.id.desc())
-    stmt = _apply_notes_cursor(stmt=stmt, patient_id=patient_id, cursor=cursor)
-    stmt = stmt.limit(limit + 1)
+) -> tuple[list[dict[str, Any]], str | None]:
+    """
+    Return a page of list items (as column mappings) and the next cursor.
 
-    fetched = (await session.execute(stmt)).scalars().all()
+    `has_structured_data` is an EXISTS probe, so derived payloads are never loaded for lists.
+    """
+
+    decoded = _decode_notes_cursor(patient_id=patient_id, cursor=cursor)
+    params: dict[str, Any] = {"patient_id": patient_id, "limit": limit + 1}
+    if decoded is None:
+        stmt = _LIST_NOTES_FIRST_PAGE
+    else:
+        stmt = _LIST_NOTES_AFTER_CURSOR
+        params["last_taken_at"] = decoded.last_taken_at
+        params["last_id"] = decoded.last_id
+
+    fetched = (await session.execute(stmt, params)).mappings().all()
     has_more = len(fetched) > limit
-    items = fetched[:limit]
+    items = [dict(row) for row in fetched[:limit]]
 
     next_cursor: str | None = None
     if has_more and items:
@@ -225,28 +292,45 @@ async def list_patient_notes(
         next_cursor = encode_note_cursor(
             cursor=NoteCursor(
                 patient_id=patient_id,
-                last_taken_at=last.taken_at,
-                last_id=last.id,
+                last_taken_at=last["taken_at"],
+                last_id=last["id"],
             )
         )
 
     return items, next_cursor
 
 
-async def get_patient_note(
+async def get_patient_note_with_patient_check(
     *,
     session: AsyncSession,
     patient_id: uuid.UUID,
     note_id: uuid.UUID,
-) -> PatientNote | None:
-    stmt = select(PatientNote).where(
-        PatientNote.id == note_id,
-        PatientNote.patient_id == patient_id,
-        PatientNote.deleted_at.is_(None),
+) -> tuple[bool, PatientNote | None]:
+    """
+    Resolve patient existence and the (live) note in a single round-trip.
+
+    Returns `(found_patient, note)`; `note` is None when the patient has no such live note.
+    """
+
+    stmt = (
+        select(Patient.id, PatientNote)
+        .select_from(Patient)
+        .outerjoin(
+            PatientNote,
+            and_(
+                PatientNote.patient_id == Patient.id,
+                PatientNote.id == note_id,
+                PatientNote.deleted_at.is_(None),
+            ),
+        )
+        .where(Patient.id == patient_id)
+        # Prefetch derived structured rows (optional) without forcing parsing at read time.
+        .options(selectinload(PatientNote.structured))
     )
-    # Prefetch derived structured rows (optional) without forcing parsing at read time.
-    stmt = stmt.options(selectinload(PatientNote.structured))
-    return (await session.execute(stmt)).scalars().first()
+    row = (await session.execute(stmt)).first()
+    if row is None:
+        return False, None
+    return True, row[1]
 
 
 async def soft_delete_patient_note(
@@ -254,6 +338,24 @@ async def soft_delete_patient_note(
     session: AsyncSession,
     note: PatientNote,
     deleted_at: datetime,
+    file_delete: asyncio.Future[None] | None = None,
 ) -> None:
+    """
+    Soft-delete a note.
+
+    `file_delete` is an in-flight removal of the note's stored file. The UPDATE is flushed while
+    it runs, but only committed once it succeeded, so a committed delete still implies the
+    content is gone; if the removal fails the note stays live and the error propagates.
+    """
+
     note.deleted_at = deleted_at
+    if file_delete is not None:
+        try:
+            await session.flush()
+            await file_delete
+        except BaseException:
+            await session.rollback()
+            # Never leave the removal running unobserved (e.g. when the flush itself failed).
+            await asyncio.gather(file_delete, return_exceptions=True)
+            raise
     await session.commit()
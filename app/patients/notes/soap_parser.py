@@ -25,6 +25,14 @@ class SoapParseResult:
 
 _SOAP_MARKER_RE = re.compile(r"(?m)^\s*([SOAPsoap])\s*:\s*")
 
+_SECTION_KEYS = ("subjective", "objective", "assessment", "plan")
+# Both cases map directly, so a match needs no `.upper()` before the lookup.
+_SECTION_BY_MARKER = {
+    marker: key
+    for letter, key in zip("SOAP", _SECTION_KEYS, strict=True)
+    for marker in (letter, letter.lower())
+}
+
 
 def parse_soap(text: str) -> SoapParseResult | None:
     """
@@ -36,32 +44,27 @@ def parse_soap(text: str) -> SoapParseResult | None:
     - Returns None when no SOAP markers are detected at all.
     """
 
-    if not text:
+    # Every marker needs a colon; a C-level substring check rejects most free-text notes
+    # without walking the regex over every character.
+    if not text or ":" not in text:
         return None
 
-    matches = list(_SOAP_MARKER_RE.finditer(text))
-    if not matches:
+    # Stream matches with one-match lookahead (a section ends where the next marker starts)
+    # instead of materializing every match up front.
+    markers = _SOAP_MARKER_RE.finditer(text)
+    current = next(markers, None)
+    if current is None:
         return None
 
-    key_map = {
-        "S": "subjective",
-        "O": "objective",
-        "A": "assessment",
-        "P": "plan",
-    }
-
     # Initialize with stable keys to keep schema predictable.
-    sections: dict[str, str | None] = {v: None for v in key_map.values()}
+    sections: dict[str, str | None] = dict.fromkeys(_SECTION_KEYS)
 
-    for idx, m in enumerate(matches):
-        marker = m.group(1).upper()
-        section_key = key_map.get(marker)
-        if section_key is None:
-            # Shouldn't happen given regex, but keep deterministic.
-            continue
+    while current is not None:
+        following = next(markers, None)
+        section_key = _SECTION_BY_MARKER[current.group(1)]
 
-        start = m.end()
-        end = matches[idx + 1].start() if idx + 1 < len(matches) else len(text)
+        start = current.end()
+        end = following.start() if following is not None else len(text)
         chunk = text[start:end]
 
         # Preserve original content exactly as captured (no trimming/normalization).
@@ -71,6 +74,8 @@ def parse_soap(text: str) -> SoapParseResult | None:
             # Deterministic handling for repeated markers: concatenate content in order.
             sections[section_key] = f"{sections[section_key]}\n{chunk}"
 
+        current = following
+
     present = [k for k, v in sections.items() if v not in (None, "")]
     if not present:
         return None
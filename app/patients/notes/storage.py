@@ -3,12 +3,17 @@ from __future__ import annotations
 import hashlib
 import os
 import uuid
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 
 from fastapi import UploadFile
 from starlette.concurrency import run_in_threadpool
 
+_COPY_CHUNK_BYTES = 1024 * 1024  # 1 MiB
+
+# fdatasync is not available everywhere (e.g. macOS); fall back to a full fsync there.
+_datasync = getattr(os, "fdatasync", os.fsync)
+
 
 class StorageIOError(Exception):
     """Raised for unexpected storage I/O failures (should map to HTTP 500)."""
@@ -24,6 +29,9 @@ class StoredFile:
     key: str
     size_bytes: int
     sha256_hex: str
+    # Raw file content, only when requested via `capture_content` (e.g. for text parsing).
+    # Kept out of repr so note content can never end up in logs.
+    content: bytes | None = field(default=None, repr=False)
 
 
 class NoteStorage:
@@ -36,6 +44,7 @@ class NoteStorage:
         note_id: uuid.UUID,
         upload: UploadFile,
         max_bytes: int,
+        capture_content: bool = False,
     ) -> StoredFile:
         raise NotImplementedError
 
@@ -46,12 +55,17 @@ class NoteStorage:
 def _safe_join(base_dir: Path, key: str) -> Path:
     """
     Prevent path traversal. `key` must stay within `base_dir`.
+
+    `base_dir` must already be resolved (absolute, symlinks expanded). The containment check is
+    lexical (`normpath` collapses `..`; an absolute key escapes the join and is rejected), so it
+    costs no filesystem calls; symlinks below the base are not followed, which is fine because
+    only this storage writes into that tree.
     """
 
-    base_dir = base_dir.resolve()
-    candidate = (base_dir / key).resolve()
-    if base_dir == candidate or base_dir in candidate.parents:
-        return candidate
+    base = str(base_dir)
+    candidate = os.path.normpath(os.path.join(base, key))
+    if candidate == base or candidate.startswith(base + os.sep):
+        return Path(candidate)
     raise StorageIOError("Invalid storage key")
 
 
@@ -60,14 +74,17 @@ def _write_upload_to_path(
     upload: UploadFile,
     dest_path: Path,
     max_bytes: int,
-) -> tuple[int, str]:
+    capture_content: bool = False,
+) -> tuple[int, str, bytes | None]:
     """
     Synchronous write (called in a threadpool).
-    Returns (size_bytes, sha256_hex).
+    Returns (size_bytes, sha256_hex, content). `content` holds the written bytes when
+    `capture_content` is set (bounded by `max_bytes`), so callers don't re-read the upload.
     """
 
     hasher = hashlib.sha256()
     size = 0
+    captured: list[bytes] | None = [] if capture_content else None
 
     dest_path.parent.mkdir(parents=True, exist_ok=True)
 
@@ -75,17 +92,27 @@ def _write_upload_to_path(
     fd = os.open(str(dest_path), os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
     try:
         with os.fdopen(fd, "wb") as f:
+            # One reusable buffer for the whole copy: `readinto` fills it in place instead of
+            # allocating a fresh 1 MiB bytes object per chunk. hashlib releases the GIL for
+            # updates of this size, so hashing runs in C at OpenSSL speed either way.
+            buffer = bytearray(_COPY_CHUNK_BYTES)
+            view = memoryview(buffer)
             while True:
-                chunk = upload.file.read(1024 * 1024)  # 1 MiB
-                if not chunk:
+                n = upload.file.readinto(buffer)
+                if not n:
                     break
-                size += len(chunk)
+                size += n
                 if size > max_bytes:
                     raise PayloadTooLargeError("uploaded file exceeds maximum allowed size")
+                chunk = view[:n]
                 hasher.update(chunk)
                 f.write(chunk)
+                if captured is not None:
+                    captured.append(bytes(chunk))
             f.flush()
-            os.fsync(f.fileno())
+            # Data must be durable before the note row is committed. fdatasync skips flushing
+            # metadata (e.g. mtime) that is not needed to read the bytes back.
+            _datasync(f.fileno())
     except Exception:
         # Best-effort cleanup; ignore cleanup errors.
         try:
@@ -94,7 +121,8 @@ def _write_upload_to_path(
             pass
         raise
 
-    return size, hasher.hexdigest()
+    content = b"".join(captured) if captured is not None else None
+    return size, hasher.hexdigest(), content
 
 
 class LocalFileStorage(NoteStorage):
@@ -106,7 +134,8 @@ class LocalFileStorage(NoteStorage):
     """
 
     def __init__(self, *, base_dir: Path):
-        self._base_dir = base_dir
+        # Resolved once; every save/delete joins keys against it.
+        self._base_dir = base_dir.resolve()
 
     async def save(
         self,
@@ -115,26 +144,31 @@ class LocalFileStorage(NoteStorage):
         note_id: uuid.UUID,
         upload: UploadFile,
         max_bytes: int,
+        capture_content: bool = False,
     ) -> StoredFile:
         random_leaf = uuid.uuid4()
-        key = str(Path(str(patient_id)) / str(note_id) / str(random_leaf))
+        key = os.path.join(str(patient_id), str(note_id), str(random_leaf))
         dest_path = _safe_join(self._base_dir, key)
 
         try:
-            size_bytes, sha256_hex = await run_in_threadpool(
-                _write_upload_to_path, upload=upload, dest_path=dest_path, max_bytes=max_bytes
+            size_bytes, sha256_hex, content = await run_in_threadpool(
+                _write_upload_to_path,
+                upload=upload,
+                dest_path=dest_path,
+                max_bytes=max_bytes,
+                capture_content=capture_content,
             )
         except PayloadTooLargeError:
             raise
         except Exception as exc:  # noqa: BLE001
             raise StorageIOError("Failed to write uploaded file") from exc
 
-        return StoredFile(key=key, size_bytes=size_bytes, sha256_hex=sha256_hex)
+        return StoredFile(key=key, size_bytes=size_bytes, sha256_hex=sha256_hex, content=content)
 
     async def delete(self, *, key: str) -> None:
         path = _safe_join(self._base_dir, key)
         try:
-            path.unlink(missing_ok=True)
+            await run_in_threadpool(path.unlink, missing_ok=True)
         except Exception as exc:  # noqa: BLE001
             raise StorageIOError("Failed to delete file") from exc
 
@@ -2,14 +2,15 @@ from __future__ import annotations
 
 import logging
 import uuid
-from typing import cast
+from typing import cast, get_args
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.db import get_session
 from app.core.llm.deps import get_openai_client
 from app.core.llm.openai_client import OpenAIError
+from app.domain.exceptions import PatientHasNotesError
 from app.patients.notes.router import router as patient_notes_router
 from app.patients.schemas import (
     PatientCreate,
@@ -34,19 +35,21 @@ router = APIRouter(prefix="/patients", tags=["patients"])
 router.include_router(patient_notes_router)
 logger = logging.getLogger("app.patient_summary")
 
+# Allowlists derived from the schema `Literal`s once at import. Validation stays here (rather
+# than typing the query params as `Literal`) to keep the documented 400 instead of a 422.
+_ALLOWED_AUDIENCES: frozenset[str] = frozenset(get_args(SummaryAudience))
+_ALLOWED_VERBOSITIES: frozenset[str] = frozenset(get_args(SummaryVerbosity))
+
 
 def _validate_summary_params(
     *, audience: str, verbosity: str
 ) -> tuple[SummaryAudience, SummaryVerbosity]:
-    allowed_audience = {"clinician", "family", "patient", "third_party"}
-    allowed_verbosity = {"short", "medium", "long"}
-
-    if audience not in allowed_audience:
+    if audience not in _ALLOWED_AUDIENCES:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid audience. Supported values: clinician, family, patient, third_party.",
         )
-    if verbosity not in allowed_verbosity:
+    if verbosity not in _ALLOWED_VERBOSITIES:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid verbosity. Supported values: short, medium, long.",
@@ -90,12 +93,15 @@ async def get_patients(
         description="Sort direction.",
     ),
     session: AsyncSession = Depends(get_session),
-) -> PatientListOut:
+) -> Response:
     # Backwards-compatible alias: `q` was the original param name.
     if name is None and q is not None:
         name = q
 
-    if name is not None and len(name.strip()) < 3:
+    if name is not None:
+        # Normalized once here; the service treats `name` as already stripped.
+        name = name.strip()
+    if name is not None and len(name) < 3:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Query parameter 'name' must be at least 3 characters long.",
@@ -114,8 +120,12 @@ async def get_patients(
     except ValueError as exc:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
 
-    items_out = [PatientListItemOut.model_validate(p) for p in items]
-    return PatientListOut(items=items_out, limit=limit, next_cursor=next_cursor)
+    # Rows come straight from typed DB columns; skip re-validating each field.
+    items_out = [PatientListItemOut.model_construct(**row) for row in items]
+    page = PatientListOut.model_construct(items=items_out, limit=limit, next_cursor=next_cursor)
+    # Serialize once here; returning the model would make FastAPI dump it, re-validate it against
+    # `response_model` and encode it again. The decorator's `response_model` still documents it.
+    return Response(content=page.model_dump_json(), media_type="application/json")
 
 
 @router.get(
@@ -154,8 +164,12 @@ async def get_patient_by_id(
 async def get_patient_summary(
     patient_id: uuid.UUID,
     request: Request,
-    audience: str = Query(default="clinician"),
-    verbosity: str = Query(default="medium"),
+    audience: str = Query(
+        default="clinician", json_schema_extra={"enum": list(get_args(SummaryAudience))}
+    ),
+    verbosity: str = Query(
+        default="medium", json_schema_extra={"enum": list(get_args(SummaryVerbosity))}
+    ),
     session: AsyncSession = Depends(get_session),
     openai_client=Depends(get_openai_client),
 ) -> PatientSummaryOut:
@@ -163,7 +177,8 @@ async def get_patient_summary(
     Generate a read-only, non-persistent patient summary using an LLM.
 
     IMPORTANT (safety):
-    - We do not store LLM output anywhere.
+    - We do not persist LLM output. The optional summary cache (off by default, see
+      `summary_cache_ttl_seconds`) keeps it in process memory only, for a bounded TTL.
     - We do not log prompts or LLM outputs (may contain PHI).
     """
 
@@ -256,16 +271,15 @@ async def update_patient_by_id(
     payload: PatientUpdate,
     session: AsyncSession = Depends(get_session),
 ) -> PatientOut:
-    patient = await get_patient(session=session, patient_id=patient_id)
-    if patient is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Patient not found")
     updated = await update_patient(
         session=session,
-        patient=patient,
+        patient_id=patient_id,
         name=payload.name,
         date_of_birth=payload.date_of_birth,
         mrn=payload.mrn,
     )
+    if updated is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Patient not found")
     return updated
 
 
@@ -277,14 +291,19 @@ async def update_patient_by_id(
     description="Delete a patient record.",
     responses={
         404: {"description": "Patient not found."},
+        409: {"description": "Patient still has notes."},
     },
 )
 async def delete_patient_by_id(
     patient_id: uuid.UUID,
     session: AsyncSession = Depends(get_session),
 ) -> None:
-    patient = await get_patient(session=session, patient_id=patient_id)
-    if patient is None:
+    try:
+        deleted = await delete_patient(session=session, patient_id=patient_id)
+    except PatientHasNotesError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail="Patient has notes and cannot be deleted"
+        ) from exc
+    if not deleted:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Patient not found")
-    await delete_patient(session=session, patient=patient)
     return None
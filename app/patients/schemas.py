@@ -11,6 +11,8 @@ SortOrder = Literal["asc", "desc"]
 
 
 class PatientCreate(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     name: str = Field(
         min_length=1,
         max_length=255,
@@ -36,6 +38,8 @@ class PatientCreate(BaseModel):
 
 
 class PatientUpdate(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     name: str | None = Field(
         default=None,
         min_length=1,
@@ -60,7 +64,7 @@ class PatientUpdate(BaseModel):
 
 
 class PatientOut(BaseModel):
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
     id: uuid.UUID = Field(description="Patient identifier (UUID).")
     mrn: str = Field(description="Medical Record Number (MRN).")
@@ -77,7 +81,7 @@ class PatientListItemOut(BaseModel):
     Exposure rule: MRN is returned on patient *detail* endpoints and summary only.
     """
 
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
     id: uuid.UUID = Field(description="Patient identifier (UUID).")
     name: str = Field(description="Patient name.")
@@ -87,6 +91,8 @@ class PatientListItemOut(BaseModel):
 
 
 class PatientListOut(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     items: list[PatientListItemOut] = Field(description="Page of patient list items.")
     limit: int = Field(description="Page size requested.", examples=[50])
     next_cursor: str | None = Field(
@@ -1,87 +1,127 @@
 from __future__ import annotations
 
-import base64
+import operator
+import re
 import secrets
 import uuid
-from datetime import date
-
-from sqlalchemy import Select, and_, func, or_, select
+from collections.abc import Callable
+from datetime import date, datetime
+from functools import cache
+from typing import Any, NamedTuple
+
+from sqlalchemy import (
+    Integer,
+    RowMapping,
+    Select,
+    bindparam,
+    delete,
+    literal,
+    select,
+    tuple_,
+    update,
+)
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
 
 from app.core.settings import get_settings
-from app.domain.exceptions import BusinessValidationError
-from app.patients.cursor_pagination import (
-    decode_patient_cursor,
-    encode_patient_cursor,
-    format_cursor_value,
-    parse_cursor_value,
-)
+from app.domain.exceptions import BusinessValidationError, PatientHasNotesError
+from app.patients.cursor_pagination import decode_patient_cursor, encode_patient_cursor
 from app.patients.models import Patient
 
+# Conservative MRN charset: ASCII letters, digits and hyphen. Matched in C via `fullmatch`
+# rather than a per-character Python loop.
+_MRN_RE = re.compile(r"[A-Za-z0-9-]+")
+
+# Maps every byte value onto the RFC 4648 Base32 alphabet (low 5 bits). 256 is a multiple of 32,
+# so each output character stays uniformly distributed.
+_MRN_TOKEN_LENGTH = 13
+_MRN_TOKEN_TABLE = bytes.maketrans(bytes(range(256)), b"ABCDEFGHIJKLMNOPQRSTUVWXYZ234567" * 8)
+
+
+class _SortSpec(NamedTuple):
+    """Everything the list query needs for one sort key, resolved once at import."""
+
+    column: InstrumentedAttribute[Any]
+    # Reads the sort value from a list row (C-level accessor).
+    get: Callable[[Any], Any]
+    # Cursor value (string) <-> column value.
+    parse: Callable[[str], Any]
+    format: Callable[[Any], str]
+
+
+# Sortable list columns, keyed by the public `sort` value.
+_SORT_SPECS: dict[str, _SortSpec] = {
+    "name": _SortSpec(Patient.name, operator.itemgetter("name"), str, str),
+    "date_of_birth": _SortSpec(
+        Patient.date_of_birth,
+        operator.itemgetter("date_of_birth"),
+        date.fromisoformat,
+        date.isoformat,
+    ),
+    "created_at": _SortSpec(
+        Patient.created_at,
+        operator.itemgetter("created_at"),
+        datetime.fromisoformat,
+        datetime.isoformat,
+    ),
+}
+
+# List items never expose MRN, so the list query selects just these columns: rows come back as
+# plain mappings without ORM identity-map bookkeeping, and MRN is never read at all.
+_PATIENT_LIST_COLUMNS = (
+    Patient.id,
+    Patient.name,
+    Patient.date_of_birth,
+    Patient.created_at,
+    Patient.updated_at,
+)
 
-def _apply_patient_filters(*, stmt: Select, q: str | None) -> Select:
-    if not q:
-        return stmt
+_LIKE_ESCAPE = "/"
 
-    normalized = q.strip().lower()
-    if not normalized:
-        return stmt
 
-    return stmt.where(func.lower(Patient.name).contains(normalized))
+def _escape_like(value: str) -> str:
+    # Same escaping as SQLAlchemy's `autoescape`, applied to a bound value instead of a literal.
+    return (
+        value.replace(_LIKE_ESCAPE, _LIKE_ESCAPE * 2)
+        .replace("%", _LIKE_ESCAPE + "%")
+        .replace("_", _LIKE_ESCAPE + "_")
+    )
 
 
-def _apply_patient_sorting(
-    *,
-    stmt: Select[tuple[Patient]],
-    sort: str | None,
-    order: str,
-) -> Select[tuple[Patient]]:
-    sort_map = {
-        "name": Patient.name,
-        "date_of_birth": Patient.date_of_birth,
-        "created_at": Patient.created_at,
-    }
-    sort_col = sort_map.get(sort or "", Patient.created_at)
-    if order == "desc":
-        return stmt.order_by(sort_col.desc(), Patient.id.desc())
-    return stmt.order_by(sort_col.asc(), Patient.id.asc())
+@cache
+def _list_patients_stmt(*, sort: str, order: str, has_name: bool, has_cursor: bool) -> Select:
+    """
+    Build the list query for one (sort, order, filter?, cursor?) shape; values are bound later.
 
+    At most 24 shapes exist, so each is built once and then reused with fresh parameters
+    (`name`, `last_value`, `last_id`, `limit`) instead of being reassembled per request.
+    """
 
-def _apply_patient_cursor(
-    *,
-    stmt: Select[tuple[Patient]],
-    sort: str,
-    order: str,
-    cursor: str | None,
-    name: str | None,
-) -> Select[tuple[Patient]]:
-    if not cursor:
-        return stmt
-
-    decoded = decode_patient_cursor(cursor=cursor, sort=sort, order=order, name=name)
-    sort_map = {
-        "name": Patient.name,
-        "date_of_birth": Patient.date_of_birth,
-        "created_at": Patient.created_at,
-    }
-    sort_col = sort_map.get(sort or "", Patient.created_at)
-    last_value = parse_cursor_value(sort=sort, raw=decoded.last_value)
-    last_id = decoded.last_id
+    sort_col = _SORT_SPECS[sort].column
+    stmt = select(*_PATIENT_LIST_COLUMNS)
+
+    if has_name:
+        # Renders as `name ILIKE '%' || :name || '%'` on PostgreSQL, which the pg_trgm GIN index
+        # can serve (a `lower(name)` wrapper would defeat it), and a lower()/LIKE pair elsewhere.
+        # The bound value is LIKE-escaped so `%` / `_` match literally.
+        stmt = stmt.where(Patient.name.icontains(bindparam("name"), escape=_LIKE_ESCAPE))
+
+    if has_cursor:
+        # Row-value comparison: a single range predicate over the `(sort_col, id)` index instead
+        # of an OR the planner may probe twice. Sort columns are NOT NULL, so semantics match.
+        keyset = tuple_(sort_col, Patient.id)
+        bound = tuple_(
+            bindparam("last_value", type_=sort_col.type),
+            bindparam("last_id", type_=Patient.id.type),
+        )
+        stmt = stmt.where(keyset < bound if order == "desc" else keyset > bound)
 
     if order == "desc":
-        return stmt.where(
-            or_(
-                sort_col < last_value,
-                and_(sort_col == last_value, Patient.id < last_id),
-            )
-        )
-    return stmt.where(
-        or_(
-            sort_col > last_value,
-            and_(sort_col == last_value, Patient.id > last_id),
-        )
-    )
+        stmt = stmt.order_by(sort_col.desc(), Patient.id.desc())
+    else:
+        stmt = stmt.order_by(sort_col.asc(), Patient.id.asc())
+    return stmt.limit(bindparam("limit", type_=Integer))
 
 
 async def list_patients(
@@ -92,30 +132,35 @@ async def list_patients(
     name: str | None,
     sort: str | None,
     order: str,
-) -> tuple[list[Patient], str | None]:
-    sort = sort or "created_at"
-    items_stmt = select(Patient)
-    items_stmt = _apply_patient_filters(stmt=items_stmt, q=name)
-    items_stmt = _apply_patient_sorting(stmt=items_stmt, sort=sort, order=order)
-    items_stmt = _apply_patient_cursor(
-        stmt=items_stmt, sort=sort, order=order, cursor=cursor, name=name
-    )
-    items_stmt = items_stmt.limit(limit + 1)
+) -> tuple[list[RowMapping], str | None]:
+    """`name` is expected already stripped (the router normalizes it)."""
 
-    fetched = (await session.execute(items_stmt)).scalars().all()
-    has_more = len(fetched) > limit
-    items = fetched[:limit]
+    sort = sort or "created_at"
+    spec = _SORT_SPECS[sort]
+    params: dict[str, Any] = {"limit": limit + 1}
+    if name:
+        params["name"] = _escape_like(name)
+    if cursor:
+        decoded = decode_patient_cursor(cursor=cursor, sort=sort, order=order, name=name)
+        params["last_value"] = spec.parse(decoded.last_value)
+        params["last_id"] = decoded.last_id
+
+    stmt = _list_patients_stmt(sort=sort, order=order, has_name=bool(name), has_cursor=bool(cursor))
+    items = list((await session.execute(stmt, params)).mappings())
+    # The extra row only signals another page; drop it in place instead of slicing a copy.
+    has_more = len(items) > limit
+    if has_more:
+        items.pop()
 
     next_cursor: str | None = None
     if has_more and items:
         last = items[-1]
-        last_value = format_cursor_value(sort=sort, value=getattr(last, sort))
         next_cursor = encode_patient_cursor(
             sort=sort,
             order=order,
             name=name,
-            last_id=last.id,
-            last_value=last_value,
+            last_id=last["id"],
+            last_value=spec.format(spec.get(last)),
         )
 
     return items, next_cursor
@@ -125,6 +170,18 @@ async def get_patient(*, session: AsyncSession, patient_id: uuid.UUID) -> Patien
     return await session.get(Patient, patient_id)
 
 
+async def patient_exists(*, session: AsyncSession, patient_id: uuid.UUID) -> bool:
+    """
+    Existence-only check for callers that never use the patient row.
+
+    Selects a constant by primary key, so the database can answer from the PK index without
+    fetching (or us hydrating) the full row.
+    """
+
+    stmt = select(literal(1)).where(Patient.id == patient_id).limit(1)
+    return (await session.execute(stmt)).scalar() is not None
+
+
 def _normalize_mrn(*, mrn: str) -> str:
     # Normalize whitespace; do not alter case (caller may depend on exact casing).
     normalized = mrn.strip()
@@ -134,9 +191,8 @@ def _normalize_mrn(*, mrn: str) -> str:
         raise BusinessValidationError("MRN must be 50 characters or fewer.")
     # Keep character set conservative. We avoid spaces and punctuation to reduce downstream issues.
     # This does NOT encode PHI; it's only format validation.
-    for ch in normalized:
-        if not (ch.isalnum() or ch == "-"):
-            raise BusinessValidationError("MRN contains invalid characters.")
+    if _MRN_RE.fullmatch(normalized) is None:
+        raise BusinessValidationError("MRN contains invalid characters.")
     return normalized
 
 
@@ -145,34 +201,17 @@ def _generate_mrn(*, prefix: str) -> str:
     Generate an opaque MRN with deterministic *format*.
 
     Strategy:
-    - Prefix (default: "MRN-") + 13 chars of Base32 (RFC4648) derived from 64 bits of randomness.
+    - Prefix (default: "MRN-") + 13 chars of the Base32 (RFC4648) alphabet, 5 random bits each.
     - Does not encode PHI (no DOB/name hashing).
     - Collision-safe in practice; uniqueness is enforced by a DB unique index, and we retry on
       conflict.
     """
 
-    token = base64.b32encode(secrets.token_bytes(8)).decode("ascii").rstrip("=")  # 13 chars
+    # One random byte per character, mapped through a table: no b32encode/padding strip.
+    token = secrets.token_bytes(_MRN_TOKEN_LENGTH).translate(_MRN_TOKEN_TABLE).decode("ascii")
     return f"{prefix}{token}"
 
 
-async def _mrn_exists(*, session: AsyncSession, mrn: str) -> bool:
-    stmt = select(Patient.id).where(Patient.mrn == mrn).limit(1)
-    row = (await session.execute(stmt)).first()
-    return row is not None
-
-
-async def _generate_unique_mrn(*, session: AsyncSession) -> str:
-    settings = get_settings()
-    prefix = settings.patient_mrn_prefix
-    # Retry loop is a belt-and-suspenders approach: DB uniqueness is the source of truth.
-    for _ in range(5):
-        candidate = _generate_mrn(prefix=prefix)
-        if not await _mrn_exists(session=session, mrn=candidate):
-            return candidate
-    # Extremely unlikely unless DB is unhealthy or uniqueness checks are racing heavily.
-    raise BusinessValidationError("Unable to generate MRN at this time.")
-
-
 async def create_patient(
     *,
     session: AsyncSession,
@@ -183,70 +222,103 @@ async def create_patient(
     _validate_date_of_birth(date_of_birth=date_of_birth)
 
     settings = get_settings()
-    normalized_mrn: str | None = None
     if mrn is not None:
         normalized_mrn = _normalize_mrn(mrn=mrn)
-        if await _mrn_exists(session=session, mrn=normalized_mrn):
-            # Do not include MRN in the message (PHI-adjacent).
-            raise BusinessValidationError("MRN is already in use.")
+    elif settings.patient_mrn_auto_generate:
+        normalized_mrn = _generate_mrn(prefix=settings.patient_mrn_prefix)
     else:
-        if not settings.patient_mrn_auto_generate:
-            # DB enforces NOT NULL; keep this as a business error rather than a DB error.
-            raise BusinessValidationError("MRN is required.")
-        normalized_mrn = await _generate_unique_mrn(session=session)
+        # DB enforces NOT NULL; keep this as a business error rather than a DB error.
+        raise BusinessValidationError("MRN is required.")
 
-    # If MRN is auto-generated, a rare race/collision can still happen at commit.
-    # We retry generation on IntegrityError without exposing the MRN.
+    # MRN uniqueness is enforced by the `uq_patients_mrn` unique index alone: no pre-insert
+    # lookup, so a create is a single INSERT. A conflict surfaces as IntegrityError at commit;
+    # a generated MRN (65 random bits) is then regenerated and retried without exposing it.
+    # Other integrity errors are not MRN collisions and are re-raised as-is.
     for _attempt in range(5):
         patient = Patient(name=name, date_of_birth=date_of_birth, mrn=normalized_mrn)
         session.add(patient)
         try:
             await session.commit()
-        except IntegrityError:
+        except IntegrityError as exc:
             await session.rollback()
+            if not _is_mrn_conflict(exc):
+                raise
             if mrn is not None:
-                # Client-provided MRN conflict (or other constraint issue). Don't leak details.
+                # Client-provided MRN conflict. Don't leak details.
+                # Do not include MRN in the message (PHI-adjacent).
                 raise BusinessValidationError("MRN is already in use.") from None
-            if not settings.patient_mrn_auto_generate:
-                raise BusinessValidationError(
-                    "Patient could not be created due to a data conflict."
-                ) from None
-            # Regenerate and retry.
-            normalized_mrn = await _generate_unique_mrn(session=session)
+            normalized_mrn = _generate_mrn(prefix=settings.patient_mrn_prefix)
             continue
 
-        await session.refresh(patient)
+        # No refresh: server defaults (created_at/updated_at) come back via INSERT ... RETURNING.
         return patient
 
+    # Extremely unlikely unless DB is unhealthy.
     raise BusinessValidationError("Unable to generate MRN at this time.")
 
 
+def _is_mrn_conflict(exc: IntegrityError) -> bool:
+    # PostgreSQL names the violated index; SQLite only names the table and column.
+    message = str(exc.orig)
+    return "uq_patients_mrn" in message or "patients.mrn" in message
+
+
 async def update_patient(
     *,
     session: AsyncSession,
-    patient: Patient,
+    patient_id: uuid.UUID,
     name: str | None,
     date_of_birth: date | None,
     mrn: str | None = None,
-) -> Patient:
-    if mrn is not None:
-        # MRN is immutable via API to preserve clinical identifier integrity.
-        raise BusinessValidationError("MRN cannot be updated.")
+) -> Patient | None:
+    """
+    Update mutable fields and return the updated patient, or `None` if it does not exist.
+
+    Issues a single `UPDATE ... RETURNING` instead of loading the row first. A payload that
+    fails validation is only looked up to keep "not found" ahead of the validation error.
+    """
 
+    try:
+        if mrn is not None:
+            # MRN is immutable via API to preserve clinical identifier integrity.
+            raise BusinessValidationError("MRN cannot be updated.")
+        if date_of_birth is not None:
+            _validate_date_of_birth(date_of_birth=date_of_birth)
+    except BusinessValidationError:
+        if not await patient_exists(session=session, patient_id=patient_id):
+            return None
+        raise
+
+    changes: dict[str, object] = {}
     if name is not None:
-        patient.name = name
+        changes["name"] = name
     if date_of_birth is not None:
-        _validate_date_of_birth(date_of_birth=date_of_birth)
-        patient.date_of_birth = date_of_birth
+        changes["date_of_birth"] = date_of_birth
 
+    if not changes:
+        return await get_patient(session=session, patient_id=patient_id)
+
+    stmt = update(Patient).where(Patient.id == patient_id).values(**changes).returning(Patient)
+    patient = (await session.execute(stmt)).scalar_one_or_none()
     await session.commit()
-    await session.refresh(patient)
     return patient
 
 
-async def delete_patient(*, session: AsyncSession, patient: Patient) -> None:
-    await session.delete(patient)
-    await session.commit()
+async def delete_patient(*, session: AsyncSession, patient_id: uuid.UUID) -> bool:
+    """
+    Delete a patient in a single statement; returns whether a row was deleted.
+
+    Notes reference patients with `ON DELETE RESTRICT` (soft-deleted notes included, they are
+    kept for audit), so a patient with notes raises `PatientHasNotesError` and is kept.
+    """
+
+    try:
+        result = await session.execute(delete(Patient).where(Patient.id == patient_id))
+        await session.commit()
+    except IntegrityError:
+        await session.rollback()
+        raise PatientHasNotesError() from None
+    return result.rowcount > 0
 
 
 def _validate_date_of_birth(*, date_of_birth: date) -> None:
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import hashlib
+import time
+from collections import OrderedDict
+
+
+class SummaryCache:
+    """
+    Bounded in-process TTL cache of generated summary text, keyed by a hash of the exact prompts.
+
+    The key covers everything the LLM sees (audience, verbosity, patient context and note
+    content), so any change to the patient's notes yields a new key and a fresh generation.
+
+    Safety: entries live in process memory only and expire after the configured TTL; nothing is
+    written to disk or shared across processes. Callers only use it when explicitly enabled.
+    """
+
+    def __init__(self, *, max_entries: int) -> None:
+        self._max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+
+    @staticmethod
+    def key(*, system_prompt: str, user_prompt: str) -> str:
+        digest = hashlib.sha256(system_prompt.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(user_prompt.encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> str | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, text = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return text
+
+    def set(self, key: str, text: str, *, ttl_seconds: int) -> None:
+        self._entries[key] = (time.monotonic() + ttl_seconds, text)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
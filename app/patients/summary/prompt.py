@@ -1,8 +1,72 @@
 from __future__ import annotations
 
-import json
+from functools import lru_cache
 from typing import Any
 
+import orjson
+
+# The prompt skeleton is static; build it once at import rather than per summary request.
+_SYSTEM_PROMPT = "\n".join(
+    [
+        "You are a careful clinical documentation assistant.",
+        "You must follow these rules:",
+        "- Do NOT invent facts, diagnoses, medications, lab values, or timelines.",
+        "- Do NOT guess missing information; if unknown, omit it.",
+        "- Do NOT speculate about causes or future outcomes.",
+        "- Base the summary ONLY on the provided input data.",
+        "- Use neutral clinical language. Avoid alarmist or judgmental phrasing.",
+        "- If there are contradictions, present them as 'conflicting documentation' without resolving.",
+        "- Do not include any content not present in the input.",
+        "",
+        "Output requirements:",
+        "- Output MUST be valid JSON (and nothing else).",
+        "- The JSON MUST be an object with exactly one key: 'text'.",
+        "- 'text' MUST be a single human-readable narrative paragraph or short set of paragraphs.",
+    ]
+)
+
+# Give the model explicit steering for audience/verbosity. Keep this in user prompt so
+# the system prompt remains stable and security-focused.
+_AUDIENCE_GUIDANCE = {
+    "clinician": "Use clinical vocabulary and focus on actionable clinical details.",
+    "family": "Use plain language; avoid jargon; explain abbreviations if present in notes.",
+    "patient": "Use respectful, supportive plain language; avoid blame; avoid heavy jargon.",
+    "third_party": "Use neutral, formal tone; focus on documented facts only; avoid sensitive details beyond what is present.",
+}
+_VERBOSITY_GUIDANCE = {
+    "short": "Be brief; prioritize the most important conditions/meds/plans.",
+    "medium": "Be concise but cover key diagnoses, medications, observations, and plans.",
+    "long": "Include more detail and chronology, while staying coherent and avoiding repetition.",
+}
+_REMINDERS = (
+    "Do not add facts that are not explicitly present above.",
+    "If a note is file-backed and content_text is null, you cannot infer its content.",
+    "Structured SOAP sections are derived and non-authoritative; treat them as helpful hints only.",
+)
+_PAYLOAD_TAIL = b',"reminders":' + orjson.dumps(_REMINDERS) + b"}"
+
+
+@lru_cache(maxsize=16)
+def _payload_head(audience: str, verbosity: str) -> bytes:
+    """
+    JSON for the fixed leading keys of the user payload, left open for the per-request keys.
+
+    Only patient context and notes vary per request; this part depends on audience/verbosity
+    alone, so it is serialized once per pair.
+    """
+
+    head = orjson.dumps(
+        {
+            "audience": audience,
+            "verbosity": verbosity,
+            "instructions": {
+                "audience_style": _AUDIENCE_GUIDANCE.get(audience, ""),
+                "detail_level": _VERBOSITY_GUIDANCE.get(verbosity, ""),
+            },
+        }
+    )
+    return head[:-1] + b","
+
 
 def build_patient_summary_prompts(
     *,
@@ -20,61 +84,26 @@ def build_patient_summary_prompts(
     - Output is forced to a JSON object with a single field: {"text": "..."}.
     """
 
-    system_prompt = "\n".join(
-        [
-            "You are a careful clinical documentation assistant.",
-            "You must follow these rules:",
-            "- Do NOT invent facts, diagnoses, medications, lab values, or timelines.",
-            "- Do NOT guess missing information; if unknown, omit it.",
-            "- Do NOT speculate about causes or future outcomes.",
-            "- Base the summary ONLY on the provided input data.",
-            "- Use neutral clinical language. Avoid alarmist or judgmental phrasing.",
-            "- If there are contradictions, present them as 'conflicting documentation' without resolving.",
-            "- Do not include any content not present in the input.",
-            "",
-            "Output requirements:",
-            "- Output MUST be valid JSON (and nothing else).",
-            "- The JSON MUST be an object with exactly one key: 'text'.",
-            "- 'text' MUST be a single human-readable narrative paragraph or short set of paragraphs.",
-        ]
+    # Same bytes as `orjson.dumps` of the full payload (key order: audience, verbosity,
+    # instructions, patient_context, notes_chronological, reminders), with the constant parts
+    # spliced in from cache.
+    user_payload = b"".join(
+        (
+            _payload_head(audience, verbosity),
+            b'"patient_context":',
+            orjson.dumps(patient_context),
+            b',"notes_chronological":',
+            orjson.dumps(notes),
+            _PAYLOAD_TAIL,
+        )
     )
 
-    # Give the model explicit steering for audience/verbosity. Keep this in user prompt so
-    # the system prompt remains stable and security-focused.
-    audience_guidance = {
-        "clinician": "Use clinical vocabulary and focus on actionable clinical details.",
-        "family": "Use plain language; avoid jargon; explain abbreviations if present in notes.",
-        "patient": "Use respectful, supportive plain language; avoid blame; avoid heavy jargon.",
-        "third_party": "Use neutral, formal tone; focus on documented facts only; avoid sensitive details beyond what is present.",
-    }
-    verbosity_guidance = {
-        "short": "Be brief; prioritize the most important conditions/meds/plans.",
-        "medium": "Be concise but cover key diagnoses, medications, observations, and plans.",
-        "long": "Include more detail and chronology, while staying coherent and avoiding repetition.",
-    }
-
-    user_payload = {
-        "audience": audience,
-        "verbosity": verbosity,
-        "instructions": {
-            "audience_style": audience_guidance.get(audience, ""),
-            "detail_level": verbosity_guidance.get(verbosity, ""),
-        },
-        "patient_context": patient_context,
-        "notes_chronological": notes,
-        "reminders": [
-            "Do not add facts that are not explicitly present above.",
-            "If a note is file-backed and content_text is null, you cannot infer its content.",
-            "Structured SOAP sections are derived and non-authoritative; treat them as helpful hints only.",
-        ],
-    }
-
     user_prompt = (
         "Create a patient summary from the following JSON input.\n"
         "Return ONLY JSON: {\"text\": \"...\"}\n\n"
-        f"{json.dumps(user_payload, ensure_ascii=False)}"
+        f"{user_payload.decode('utf-8')}"
     )
 
-    return system_prompt, user_prompt
+    return _SYSTEM_PROMPT, user_prompt
 
 
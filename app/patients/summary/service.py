@@ -6,12 +6,15 @@ from typing import Any, Protocol
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
 from app.core.settings import get_settings
 from app.patients.models import Patient
-from app.patients.notes.models import PatientNote
-from app.patients.service import get_patient
+from app.patients.notes.models import (
+    PatientNote,
+    PatientNoteStructured,
+    structured_data_payload,
+)
+from app.patients.summary.cache import SummaryCache
 from app.patients.summary.prompt import build_patient_summary_prompts
 from app.patients.summary.schemas import (
     PatientHeading,
@@ -22,6 +25,23 @@ from app.patients.summary.schemas import (
     _LLMSummaryJSON,
 )
 
+# Process-wide; only consulted when `summary_cache_ttl_seconds` > 0.
+_SUMMARY_CACHE = SummaryCache(max_entries=1024)
+
+
+_NO_NOTES_SUMMARY_TEXT = "No clinical notes are documented for this patient."
+
+_SUMMARY_NOTE_COLUMNS = (
+    PatientNote.id,
+    PatientNote.taken_at,
+    PatientNote.note_type,
+    PatientNote.file_path,
+    PatientNote.content_text,
+    PatientNote.content_mime_type,
+    PatientNote.file_size_bytes,
+    PatientNote.checksum_sha256,
+)
+
 
 class LLMClient(Protocol):
     async def generate_json(self, *, system_prompt: str, user_prompt: str) -> dict[str, Any]: ...
@@ -34,41 +54,36 @@ class PatientSummaryLLMError(Exception):
 def _calculate_age(*, date_of_birth: date, today: date | None = None) -> int:
     today = today or date.today()
     years = today.year - date_of_birth.year
-    # If birthday hasn't occurred yet this year, subtract one year.
-    if (today.month, today.day) < (date_of_birth.month, date_of_birth.day):
+    # If birthday hasn't occurred yet this year, subtract one year. Month/day are compared as a
+    # single MMDD integer.
+    if today.month * 100 + today.day < date_of_birth.month * 100 + date_of_birth.day:
         years -= 1
     return max(years, 0)
 
 
-def _truncate_notes_for_prompt(
-    *, notes: list[dict[str, Any]], max_prompt_chars: int
-) -> list[dict[str, Any]]:
+def _truncate_note_text(note: dict[str, Any], *, remaining: int) -> int:
     """
-    Soft-cap the prompt size by truncating note text fields while keeping metadata.
+    Soft-cap the prompt size by truncating the note's text in place while keeping metadata.
+
+    Returns the character budget left for the following notes.
 
     Safety: when truncation occurs, we explicitly mark the note as truncated so the
     model does not infer missing content.
     """
 
-    remaining = max_prompt_chars
-    out: list[dict[str, Any]] = []
-
-    for note in notes:
-        n = dict(note)
-        text = n.get("content_text")
-        if isinstance(text, str) and text:
-            if remaining <= 0:
-                n["content_text"] = None
-                n["content_truncated"] = True
-            elif len(text) > remaining:
-                n["content_text"] = text[:remaining] + "\n[TRUNCATED]"
-                n["content_truncated"] = True
-                remaining = 0
-            else:
-                remaining -= len(text)
-        out.append(n)
-
-    return out
+    text = note["content_text"]
+    if not isinstance(text, str) or not text:
+        return remaining
+    if remaining <= 0:
+        note["content_text"] = None
+        note["content_truncated"] = True
+        return 0
+    text_len = len(text)
+    if text_len > remaining:
+        note["content_text"] = text[:remaining] + "\n[TRUNCATED]"
+        note["content_truncated"] = True
+        return 0
+    return remaining - text_len
 
 
 class PatientSummaryService:
@@ -83,7 +98,16 @@ class PatientSummaryService:
         audience: SummaryAudience,
         verbosity: SummaryVerbosity,
     ) -> PatientSummaryOut | None:
-        patient: Patient | None = await get_patient(session=self._session, patient_id=patient_id)
+        # Patient heading fields plus a "has any live notes" flag in one round-trip.
+        has_notes = (
+            select(PatientNote.id)
+            .where(PatientNote.patient_id == Patient.id, PatientNote.deleted_at.is_(None))
+            .exists()
+        )
+        patient_stmt = select(
+            Patient.name, Patient.date_of_birth, Patient.mrn, has_notes.label("has_notes")
+        ).where(Patient.id == patient_id)
+        patient = (await self._session.execute(patient_stmt)).one_or_none()
         if patient is None:
             return None
 
@@ -93,35 +117,72 @@ class PatientSummaryService:
             mrn=patient.mrn,
         )
 
+        if not patient.has_notes:
+            # Nothing to summarize: answer without an LLM call (and without inviting the model to
+            # produce content that no documentation supports).
+            return PatientSummaryOut(
+                patient_heading=heading,
+                summary=SummaryContent(
+                    audience=audience, verbosity=verbosity, text=_NO_NOTES_SUMMARY_TEXT
+                ),
+            )
+
+        # Plain column projection (no ORM entities): the note columns the prompt uses, with the
+        # derived structured rows outer-joined in. A note can have several structured rows (one
+        # per schema); they arrive as consecutive rows and the newest one wins, as in the API.
         stmt = (
-            select(PatientNote)
+            select(
+                *_SUMMARY_NOTE_COLUMNS,
+                PatientNoteStructured.schema.label("structured_schema"),
+                PatientNoteStructured.data.label("structured_payload"),
+                PatientNoteStructured.updated_at.label("structured_updated_at"),
+                PatientNoteStructured.created_at.label("structured_created_at"),
+            )
+            .outerjoin(PatientNoteStructured, PatientNoteStructured.note_id == PatientNote.id)
             .where(PatientNote.patient_id == patient_id, PatientNote.deleted_at.is_(None))
-            .options(selectinload(PatientNote.structured))
             .order_by(PatientNote.taken_at.asc(), PatientNote.id.asc())
         )
-        notes_rows = (await self._session.execute(stmt)).scalars().all()
+        rows = (await self._session.execute(stmt)).mappings()
 
+        # One pass: each note dict is built fresh and truncated in place against the prompt budget.
+        settings = get_settings()
+        remaining = int(settings.openai_max_prompt_chars)
         notes_for_prompt: list[dict[str, Any]] = []
-        for n in notes_rows:
-            notes_for_prompt.append(
-                {
-                    "id": str(n.id),
-                    "taken_at": n.taken_at.isoformat(),
-                    "note_type": n.note_type,
-                    "has_file": bool(n.has_file),
+        note: dict[str, Any] | None = None
+        note_id: uuid.UUID | None = None
+        best_structured_key: tuple[Any, Any] | None = None
+        for row in rows:
+            if row["id"] != note_id:
+                note_id = row["id"]
+                best_structured_key = None
+                note = {
+                    "id": str(note_id),
+                    "taken_at": row["taken_at"].isoformat(),
+                    "note_type": row["note_type"],
+                    "has_file": row["file_path"] is not None,
                     # Only include fields that are already returned by the API.
-                    "content_text": n.content_text,
-                    "content_mime_type": n.content_mime_type,
-                    "file_size_bytes": n.file_size_bytes,
-                    "checksum_sha256": n.checksum_sha256,
-                    "structured_data": n.structured_data,
+                    "content_text": row["content_text"],
+                    "content_mime_type": row["content_mime_type"],
+                    "file_size_bytes": row["file_size_bytes"],
+                    "checksum_sha256": row["checksum_sha256"],
+                    "structured_data": None,
                 }
-            )
-
-        settings = get_settings()
-        notes_for_prompt = _truncate_notes_for_prompt(
-            notes=notes_for_prompt, max_prompt_chars=int(settings.openai_max_prompt_chars)
-        )
+                remaining = _truncate_note_text(note, remaining=remaining)
+                notes_for_prompt.append(note)
+
+            if row["structured_schema"] is None or note is None:
+                continue
+            key = (row["structured_updated_at"], row["structured_created_at"])
+            if best_structured_key is None or key > best_structured_key:
+                best_structured_key = key
+                note["structured_data"] = structured_data_payload(
+                    data=row["structured_payload"], schema=row["structured_schema"]
+                )
+
+        # Everything the prompt needs is now plain data. Release the pooled connection (and end the
+        # read transaction) before the LLM call, which can take seconds; holding it would pin a
+        # pool slot per in-flight summary.
+        await self._session.close()
 
         # Only send minimal patient context; avoid unnecessary PHI / PHI-adjacent fields.
         # MRN is returned by the API heading, but it's not needed for summary generation.
@@ -134,15 +195,27 @@ class PatientSummaryService:
             notes=notes_for_prompt,
         )
 
-        try:
-            llm_json = await self._llm.generate_json(
-                system_prompt=system_prompt, user_prompt=user_prompt
-            )
-            parsed = _LLMSummaryJSON.model_validate(llm_json)
-        except Exception as exc:  # noqa: BLE001
-            raise PatientSummaryLLMError("LLM summary generation failed") from exc
+        cache_ttl = settings.summary_cache_ttl_seconds
+        cache_key: str | None = None
+        text: str | None = None
+        if cache_ttl > 0:
+            # Identical prompts (same notes, audience and verbosity) reuse the last generation.
+            cache_key = SummaryCache.key(system_prompt=system_prompt, user_prompt=user_prompt)
+            text = _SUMMARY_CACHE.get(cache_key)
+
+        if text is None:
+            try:
+                llm_json = await self._llm.generate_json(
+                    system_prompt=system_prompt, user_prompt=user_prompt
+                )
+                parsed = _LLMSummaryJSON.model_validate(llm_json)
+            except Exception as exc:  # noqa: BLE001
+                raise PatientSummaryLLMError("LLM summary generation failed") from exc
+            text = parsed.text
+            if cache_key is not None:
+                _SUMMARY_CACHE.set(cache_key, text, ttl_seconds=cache_ttl)
 
         return PatientSummaryOut(
             patient_heading=heading,
-            summary=SummaryContent(audience=audience, verbosity=verbosity, text=parsed.text),
+            summary=SummaryContent(audience=audience, verbosity=verbosity, text=text),
         )
@@ -15,8 +15,9 @@ import os
 import uuid
 from datetime import date
 
-from sqlalchemy import func, select
+from sqlalchemy import insert, select
 from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
 
 from app.patients.models import Patient
 
@@ -73,20 +74,25 @@ def _seed_rows() -> list[dict]:
 
 async def seed_patients_if_empty(*, database_url: str) -> None:
     """Seed 15 patients if the patients table is empty."""
-    engine = create_async_engine(database_url, pool_pre_ping=True)
+    # One-shot script holding a single session: a fresh, unpooled connection is all it needs (the
+    # API's pooled engine is configured in app.core.db).
+    engine = create_async_engine(database_url, poolclass=NullPool)
     sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
 
     async with sessionmaker() as session:
-        total = int((await session.execute(select(func.count()).select_from(Patient))).scalar_one())
-        if total > 0:
-            print(f"Seed skipped: patients table already has {total} row(s).")
+        # Only emptiness matters: probe for any row instead of counting the whole table.
+        has_rows = (await session.execute(select(Patient.id).limit(1))).first() is not None
+        if has_rows:
+            print("Seed skipped: patients table is not empty.")
             await engine.dispose()
             return
 
-        patients = [Patient(**row) for row in _seed_rows()]
-        session.add_all(patients)
+        # Bulk INSERT (executemany / multi-row VALUES) instead of flushing 15 ORM objects;
+        # created_at/updated_at come from the server defaults.
+        rows = _seed_rows()
+        await session.execute(insert(Patient), rows)
         await session.commit()
-        print(f"Seeded {len(patients)} patients.")
+        print(f"Seeded {len(rows)} patients.")
 
     await engine.dispose()
 
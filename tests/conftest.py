@@ -2,40 +2,238 @@ from __future__ import annotations
 
 import asyncio
 import os
-
+import shutil
+import uuid
+from collections.abc import AsyncIterator, Awaitable, Callable, Sequence
+from contextlib import AsyncExitStack
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any
+
+import httpx
 import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+from sqlalchemy import event, insert
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession, async_sessionmaker
 
-from app.core.db import Base, create_engine
-
+from app.core.db import Base, create_engine, get_session
+from app.core.ids import new_id
+from tests.patients._helpers import NotesFactory, PatientFactory
 
-@pytest.fixture()
-def database_url(tmp_path) -> str:
-    db_file = tmp_path / "test.sqlite3"
-    return f"sqlite+aiosqlite:///{db_file}"
 
+def pytest_collection_modifyitems(items: list[pytest.Item]) -> None:
+    # Run every async test on the session event loop, where the shared app and engine live.
+    session_loop = pytest.mark.asyncio(loop_scope="session")
+    for item in items:
+        if pytest_asyncio.is_async_test(item):
+            item.add_marker(session_loop, append=False)
 
-@pytest.fixture(autouse=True)
-def _set_test_database_url(database_url: str) -> None:
-    os.environ["DATABASE_URL"] = database_url
-    # Settings are cached via @lru_cache; clear so each test can use its own DB URL.
-    from app.core.settings import get_settings
-
-    get_settings.cache_clear()
 
+@pytest.fixture(scope="session")
+def _schema_template(tmp_path_factory) -> Path:
+    """Create the schema once per test session in a template SQLite file."""
+    template = tmp_path_factory.mktemp("schema") / "template.sqlite3"
 
-@pytest.fixture(autouse=True)
-def _create_test_schema(database_url: str) -> None:
     async def run() -> None:
         # Ensure all model modules are imported so Base.metadata is populated.
         from app.patients import models as _patients_models  # noqa: F401
         from app.patients.notes import models as _patient_notes_models  # noqa: F401
 
-        engine = create_engine(database_url=database_url)
+        engine = create_engine(database_url=f"sqlite+aiosqlite:///{template}")
         async with engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
         await engine.dispose()
 
     asyncio.run(run())
+    return template
+
+
+def _copy_database(*, template: Path, target: Path) -> str:
+    shutil.copyfile(template, target)
+    return f"sqlite+aiosqlite:///{target}"
+
+
+@pytest.fixture(scope="session")
+def database_url(_schema_template: Path, tmp_path_factory) -> str:
+    """The session-wide database. Tests never commit to it (see `db_connection`)."""
+    target = tmp_path_factory.mktemp("db") / "test.sqlite3"
+    url = _copy_database(template=_schema_template, target=target)
+    os.environ["DATABASE_URL"] = url
+    return url
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _default_storage_base_path(tmp_path_factory) -> None:
+    # Tests that upload files point this at their own tmp_path; the default keeps any other
+    # write out of the repository and apart from other pytest-xdist workers.
+    os.environ["LOCAL_STORAGE_BASE_PATH"] = str(tmp_path_factory.mktemp("notes"))
+
+
+@pytest.fixture(autouse=True)
+def _clear_settings_cache(database_url: str) -> None:
+    # Settings are cached via @lru_cache; clear so env changes from earlier tests don't leak.
+    from app.core.settings import get_settings
+
+    get_settings.cache_clear()
+
+
+@pytest_asyncio.fixture(scope="session")
+async def _test_engine(database_url: str) -> AsyncIterator[AsyncEngine]:
+    engine = create_engine(database_url=database_url)
+
+    # pysqlite (and so aiosqlite) defers BEGIN and would let a SAVEPOINT release commit the
+    # enclosing work; take over transaction control so the per-test rollback undoes everything.
+    @event.listens_for(engine.sync_engine, "connect")
+    def _disable_pysqlite_transactions(dbapi_connection: Any, _connection_record: Any) -> None:
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine.sync_engine, "begin")
+    def _emit_begin(conn: Any) -> None:
+        conn.exec_driver_sql("BEGIN")
+
+    yield engine
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture(scope="session")
+async def shared_app(database_url: str) -> AsyncIterator[FastAPI]:
+    """One application (and lifespan) for the whole session."""
+    from app.main import create_app
+
+    application = create_app()
+    async with application.router.lifespan_context(application):
+        yield application
+
+
+@pytest.fixture
+async def db_connection(
+    _test_engine: AsyncEngine, shared_app: FastAPI
+) -> AsyncIterator[AsyncConnection]:
+    """
+    A connection holding an outer transaction that is rolled back after the test.
+
+    Request sessions join it through SAVEPOINTs, so `commit()`/`rollback()` in application code
+    behave as usual while nothing ever reaches the database file.
+    """
+
+    async with _test_engine.connect() as conn:
+        transaction = await conn.begin()
+        sessionmaker = async_sessionmaker(
+            bind=conn, expire_on_commit=False, join_transaction_mode="create_savepoint"
+        )
+
+        async def _get_test_session() -> AsyncIterator[AsyncSession]:
+            async with sessionmaker() as session:
+                yield session
+
+        shared_app.dependency_overrides[get_session] = _get_test_session
+        try:
+            yield conn
+        finally:
+            shared_app.dependency_overrides.clear()
+            await transaction.rollback()
+
+
+@pytest.fixture
+async def async_client(
+    shared_app: FastAPI, db_connection: AsyncConnection
+) -> AsyncIterator[httpx.AsyncClient]:
+    """
+    In-process client for the shared app.
+
+    Requests go straight through `httpx.ASGITransport` on the test's event loop, so there is no
+    per-request thread/portal hop as with the sync `TestClient`.
+    """
+
+    transport = httpx.ASGITransport(app=shared_app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+@pytest.fixture
+def patient_factory(db_connection: AsyncConnection) -> PatientFactory:
+    """
+    Insert patients straight into the test transaction and return their ids.
+
+    For tests that only need a patient to exist; tests of the create endpoint itself use
+    `create_patient` (the HTTP path) instead.
+    """
+
+    from app.patients.models import Patient
+
+    async def create(*, name: str, date_of_birth: str) -> str:
+        patient_id = new_id()
+        await db_connection.execute(
+            insert(Patient).values(
+                id=patient_id,
+                mrn=f"MRN-{patient_id.hex.upper()}",
+                name=name,
+                date_of_birth=date.fromisoformat(date_of_birth),
+            )
+        )
+        return str(patient_id)
+
+    return create
+
+
+@pytest.fixture
+def notes_factory(db_connection: AsyncConnection) -> NotesFactory:
+    """
+    Insert inline-text notes for a patient in one batched INSERT and return their ids.
+
+    Each note is a `(taken_at, content_text)` pair. For tests that only need notes to exist;
+    tests of the create endpoint itself POST them.
+    """
+
+    from app.patients.notes.models import PatientNote
+
+    async def create(*, patient_id: str, notes: Sequence[tuple[datetime, str]]) -> list[str]:
+        rows = [
+            {
+                "id": new_id(),
+                "patient_id": uuid.UUID(patient_id),
+                "taken_at": taken_at,
+                "content_text": content_text,
+                "content_mime_type": "text/plain",
+            }
+            for taken_at, content_text in notes
+        ]
+        await db_connection.execute(insert(PatientNote), rows)
+        return [str(row["id"]) for row in rows]
+
+    return create
+
+
+@pytest.fixture
+async def async_client_factory(
+    _schema_template: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> AsyncIterator[Callable[[FastAPI], Awaitable[httpx.AsyncClient]]]:
+    """
+    Open clients for apps built by the test, each on its own real engine.
+
+    For tests that must observe the application's own engine/pool. The apps get a fresh copy of
+    the schema, so their commits are isolated from the shared database. The app lifespan is
+    entered explicitly because the transport does not run it.
+    """
+
+    monkeypatch.setenv(
+        "DATABASE_URL",
+        _copy_database(template=_schema_template, target=tmp_path / "test.sqlite3"),
+    )
+    from app.core.settings import get_settings
+
+    get_settings.cache_clear()
+    async with AsyncExitStack() as stack:
+
+        async def open_client(app: FastAPI) -> httpx.AsyncClient:
+            await stack.enter_async_context(app.router.lifespan_context(app))
+            return await stack.enter_async_context(
+                httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+            )
+
+        yield open_client
+    get_settings.cache_clear()
 
 
 @pytest.fixture
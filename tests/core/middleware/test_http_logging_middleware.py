@@ -113,3 +113,35 @@ def test_unhandled_exception_returns_500_and_logs_error_with_request_id(
 
     # Stack trace is required for unhandled exceptions.
     assert record.exc_info
+
+
+def test_replaces_unsafe_request_id(caplog: pytest.LogCaptureFixture) -> None:
+    """An X-Request-ID outside the safe charset/length must not be propagated or logged."""
+    caplog.set_level(logging.INFO, logger="app.http")
+    app = _make_app()
+
+    with TestClient(app) as client:
+        res = client.get("/health", headers={"X-Request-ID": "bad id;drop"})
+
+    assert res.status_code == 200
+    generated = res.headers["x-request-id"]
+    assert generated != "bad id;drop"
+    assert generated.isalnum()
+
+    records = _get_http_log_records(caplog)
+    info_records = [r for r in records if r.levelno == logging.INFO]
+    assert len(info_records) == 1
+    assert info_records[0].__dict__["request_id"] == generated
+
+
+def test_skips_info_log_when_level_disabled(caplog: pytest.LogCaptureFixture) -> None:
+    """With INFO filtered out, no completion record is emitted but the header is still set."""
+    caplog.set_level(logging.WARNING, logger="app.http")
+    app = _make_app()
+
+    with TestClient(app) as client:
+        res = client.get("/health")
+
+    assert res.status_code == 200
+    assert res.headers["x-request-id"]
+    assert _get_http_log_records(caplog) == []
@@ -0,0 +1,22 @@
+"""Unit tests for primary key id generation."""
+
+from __future__ import annotations
+
+import uuid
+
+from app.core.ids import new_id
+
+
+def test_new_id_is_uuid_v7() -> None:
+    value = new_id()
+    assert isinstance(value, uuid.UUID)
+    assert value.version == 7
+    assert value.variant == uuid.RFC_4122
+
+
+def test_new_ids_are_time_ordered_and_unique() -> None:
+    ids = [new_id() for _ in range(1000)]
+    assert len(set(ids)) == len(ids)
+    # Same-millisecond ids share a timestamp prefix; ordering is guaranteed across milliseconds.
+    timestamps = [value.int >> 80 for value in ids]
+    assert timestamps == sorted(timestamps)
@@ -0,0 +1,52 @@
+"""Unit tests for the shared OpenAI client dependency."""
+
+from __future__ import annotations
+
+import pytest
+
+from app.core.llm.deps import close_openai_client, get_openai_client
+from app.core.settings import get_settings
+
+
+def _reload_settings(monkeypatch: pytest.MonkeyPatch, **env: str | None) -> None:
+    for name, value in env.items():
+        if value is None:
+            monkeypatch.delenv(name, raising=False)
+        else:
+            monkeypatch.setenv(name, value)
+    get_settings.cache_clear()
+
+
+async def test_reconfigured_openai_client_closes_the_replaced_one_after_a_grace_period(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    _reload_settings(monkeypatch, OPENAI_API_KEY="test-key", OPENAI_MODEL="model-a")
+    try:
+        first = await get_openai_client()
+        assert first is not None
+        assert await get_openai_client() is first
+
+        _reload_settings(monkeypatch, OPENAI_MODEL="model-b")
+        second = await get_openai_client()
+        assert second is not None and second is not first
+        # Requests still holding the replaced client can finish on it.
+        assert not first._client.is_closed
+    finally:
+        await close_openai_client()
+    assert first._client.is_closed
+    assert second._client.is_closed
+
+
+async def test_removing_the_api_key_retires_the_shared_client(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    _reload_settings(monkeypatch, OPENAI_API_KEY="test-key")
+    try:
+        client = await get_openai_client()
+        assert client is not None
+
+        _reload_settings(monkeypatch, OPENAI_API_KEY=None)
+        assert await get_openai_client() is None
+    finally:
+        await close_openai_client()
+    assert client._client.is_closed
@@ -0,0 +1,76 @@
+"""Unit tests for the Prometheus metrics middleware.
+
+We assert on the exported counter samples and verify:
+- Requests are labeled by route template (never the raw path)
+- Unmatched paths and unhandled exceptions are still counted
+"""
+
+from __future__ import annotations
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from app.core.metrics import PrometheusMetricsMiddleware
+
+
+def _make_app() -> FastAPI:
+    """Create a minimal app for middleware unit tests."""
+    app = FastAPI()
+    app.add_middleware(PrometheusMetricsMiddleware)
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: str) -> dict[str, str]:
+        return {"id": item_id}
+
+    @app.get("/metrics-boom")
+    async def boom() -> None:
+        raise RuntimeError("boom")
+
+    return app
+
+
+def _requests_total(*, method: str, route: str, status_code: str) -> float:
+    value = REGISTRY.get_sample_value(
+        "http_requests_total",
+        {"method": method, "route": route, "status_code": status_code},
+    )
+    return value or 0.0
+
+
+def test_counts_requests_by_route_template() -> None:
+    """Identifiers in the URL must not leak into labels; the route template is used instead."""
+    before = _requests_total(method="GET", route="/items/{item_id}", status_code="200")
+
+    with TestClient(_make_app()) as client:
+        res = client.get("/items/patient-123")
+        assert res.status_code == 200
+        res = client.get("/items/patient-456")
+        assert res.status_code == 200
+
+    after = _requests_total(method="GET", route="/items/{item_id}", status_code="200")
+    assert after - before == 2
+    assert (
+        REGISTRY.get_sample_value(
+            "http_requests_total",
+            {"method": "GET", "route": "/items/patient-123", "status_code": "200"},
+        )
+        is None
+    )
+
+
+def test_counts_unmatched_and_failed_requests() -> None:
+    """404s are labeled `unmatched`; unhandled exceptions are recorded as 500."""
+    unmatched_before = _requests_total(method="GET", route="unmatched", status_code="404")
+    boom_before = _requests_total(method="GET", route="/metrics-boom", status_code="500")
+
+    with TestClient(_make_app(), raise_server_exceptions=False) as client:
+        assert client.get("/does-not-exist").status_code == 404
+        assert client.get("/metrics-boom").status_code == 500
+
+    assert _requests_total(method="GET", route="unmatched", status_code="404") == (
+        unmatched_before + 1
+    )
+    assert _requests_total(method="GET", route="/metrics-boom", status_code="500") == (
+        boom_before + 1
+    )
@@ -2,13 +2,31 @@
 
 from __future__ import annotations
 
-from starlette.testclient import TestClient
+from collections.abc import Awaitable, Sequence
+from datetime import datetime
+from typing import Protocol
 
+import httpx
 
-def create_patient(*, client: TestClient, name: str, date_of_birth: str) -> str:
+
+class PatientFactory(Protocol):
+    """Inserts a patient row directly (see the `patient_factory` fixture) and returns its id."""
+
+    def __call__(self, *, name: str, date_of_birth: str) -> Awaitable[str]: ...
+
+
+class NotesFactory(Protocol):
+    """Inserts inline-text notes directly (see the `notes_factory` fixture); returns their ids."""
+
+    def __call__(
+        self, *, patient_id: str, notes: Sequence[tuple[datetime, str]]
+    ) -> Awaitable[list[str]]: ...
+
+
+async def create_patient(*, client: httpx.AsyncClient, name: str, date_of_birth: str) -> str:
     """Create a patient and return its id."""
     # Safety: never follow redirects on POST. A 307/308 would re-POST and can create duplicates.
-    res = client.post(
+    res = await client.post(
         "/patients",
         json={"name": name, "date_of_birth": date_of_birth},
         follow_redirects=False,
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from app.core.settings import Settings
+
+
+@pytest.fixture
+def override_notes_settings(monkeypatch: pytest.MonkeyPatch) -> Callable[..., Settings]:
+    """
+    Replace the settings the notes endpoints read, for this test only.
+
+    The notes router calls `get_settings()` directly (a sync FastAPI dependency would cost a
+    threadpool hop per request), so the override is applied to that module rather than through
+    `app.dependency_overrides`. The environment and the global settings cache are left alone.
+    """
+
+    from app.core.settings import get_settings
+    from app.patients.notes import router as notes_router
+
+    def override(**updates: Any) -> Settings:
+        # A fresh instance (not `model_copy`) so cached derived values such as the upload byte
+        # limit are recomputed. `model_construct` skips the env sources, which would otherwise
+        # take precedence over these values; pass them already typed.
+        settings = Settings.model_construct(**{**get_settings().model_dump(), **updates})
+        monkeypatch.setattr(notes_router, "get_settings", lambda: settings)
+        return settings
+
+    return override
+
+
+@pytest.fixture
+def note_storage_dir(tmp_path: Path, override_notes_settings: Callable[..., Settings]) -> Path:
+    """Point local note storage at a per-test directory and return it."""
+    base_dir = tmp_path / "data" / "notes"
+    override_notes_settings(local_storage_base_path=str(base_dir))
+    return base_dir
@@ -0,0 +1,15 @@
+from __future__ import annotations
+
+import pytest
+
+from app.patients.notes.storage import StorageIOError, _safe_join
+
+
+def test_safe_join_keeps_keys_inside_base_dir(tmp_path) -> None:
+    base_dir = tmp_path.resolve()
+
+    assert _safe_join(base_dir, "p/n/leaf") == base_dir / "p" / "n" / "leaf"
+
+    for key in ("../escape", "p/../../escape", "/etc/passwd"):
+        with pytest.raises(StorageIOError):
+            _safe_join(base_dir, key)
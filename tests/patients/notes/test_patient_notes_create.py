@@ -1,19 +1,24 @@
 from __future__ import annotations
 
 from datetime import UTC, datetime, timedelta
+from pathlib import Path
 
-from starlette.testclient import TestClient
+import httpx
 
-from tests.patients._helpers import create_patient
+from tests.patients._helpers import PatientFactory
 
+# Fixed, valid (past) note time; only the future-date test needs the real clock.
+TAKEN_AT = datetime(2025, 1, 1, tzinfo=UTC).isoformat()
 
-def test_create_patient_note_inline_text_happy_path(client: TestClient) -> None:
-    patient_id = create_patient(client=client, name="Alice Example", date_of_birth="1990-01-01")
 
-    taken_at = datetime.now(UTC).isoformat()
-    resp = client.post(
+async def test_create_patient_note_inline_text_happy_path(
+    async_client: httpx.AsyncClient, patient_factory: PatientFactory
+) -> None:
+    patient_id = await patient_factory(name="Alice Example", date_of_birth="1990-01-01")
+
+    resp = await async_client.post(
         f"/patients/{patient_id}/notes",
-        json={"taken_at": taken_at, "note_type": "progress", "content_text": "Patient is stable."},
+        json={"taken_at": TAKEN_AT, "note_type": "progress", "content_text": "Patient is stable."},
     )
 
     assert resp.status_code == 201, resp.text
@@ -24,12 +29,77 @@ def test_create_patient_note_inline_text_happy_path(client: TestClient) -> None:
     assert data["has_file"] is False
 
 
-def test_create_patient_note_rejects_future_taken_at(client: TestClient) -> None:
-    patient_id = create_patient(client=client, name="Bob Example", date_of_birth="1991-01-01")
+async def test_create_patient_note_rejects_future_taken_at(
+    async_client: httpx.AsyncClient, patient_factory: PatientFactory
+) -> None:
+    patient_id = await patient_factory(name="Bob Example", date_of_birth="1991-01-01")
 
     future = (datetime.now(UTC) + timedelta(days=1)).isoformat()
-    resp = client.post(
+    resp = await async_client.post(
         f"/patients/{patient_id}/notes",
         json={"taken_at": future, "content_text": "Future note"},
     )
     assert resp.status_code == 400, resp.text
+
+
+async def test_create_patient_note_malformed_json_returns_422(
+    async_client: httpx.AsyncClient, patient_factory: PatientFactory
+) -> None:
+    patient_id = await patient_factory(name="Bad Json", date_of_birth="1990-01-01")
+
+    resp = await async_client.post(
+        f"/patients/{patient_id}/notes",
+        content=b'{"taken_at": ',
+        headers={"Content-Type": "application/json"},
+    )
+    assert resp.status_code == 422
+
+
+async def test_create_patient_note_for_missing_patient_returns_404(
+    async_client: httpx.AsyncClient,
+) -> None:
+    missing_id = "00000000-0000-0000-0000-000000000000"
+
+    resp = await async_client.post(
+        f"/patients/{missing_id}/notes",
+        json={"taken_at": TAKEN_AT, "content_text": "Orphan note"},
+    )
+    assert resp.status_code == 404, resp.text
+
+    resp = await async_client.post(
+        f"/patients/{missing_id}/notes",
+        data={"taken_at": TAKEN_AT},
+        files={"file": ("note.txt", b"Orphan upload", "text/plain")},
+    )
+    assert resp.status_code == 404, resp.text
+
+
+async def test_file_upload_for_missing_patient_returns_404_before_touching_storage(
+    async_client: httpx.AsyncClient, note_storage_dir: Path
+) -> None:
+    missing_id = "00000000-0000-0000-0000-000000000000"
+
+    # 404 wins over payload errors (here an unsupported media type) for an unknown patient.
+    for content_type in ("text/plain", "application/zip"):
+        resp = await async_client.post(
+            f"/patients/{missing_id}/notes",
+            data={"taken_at": TAKEN_AT},
+            files={"file": ("note.bin", b"Orphan upload", content_type)},
+        )
+        assert resp.status_code == 404, resp.text
+        assert resp.json()["detail"] == "Patient not found"
+
+    assert not note_storage_dir.exists() or not any(note_storage_dir.iterdir())
+
+
+async def test_create_patient_note_accepts_json_content_type_parameters(
+    async_client: httpx.AsyncClient, patient_factory: PatientFactory
+) -> None:
+    patient_id = await patient_factory(name="Charset Json", date_of_birth="1990-01-01")
+
+    resp = await async_client.post(
+        f"/patients/{patient_id}/notes",
+        content=f'{{"taken_at": "{TAKEN_AT}", "content_text": "ok"}}',
+        headers={"Content-Type": "Application/JSON; charset=utf-8"},
+    )
+    assert resp.status_code == 201, resp.text
@@ -1,24 +1,24 @@
 from __future__ import annotations
 
-import os
+from collections.abc import Callable
 from datetime import datetime, timezone
 from pathlib import Path
 
-from starlette.testclient import TestClient
+import httpx
 
-from tests.patients._helpers import create_patient
+from app.core.settings import Settings
+from tests.patients._helpers import PatientFactory
 
 
-def test_create_patient_note_file_rejects_unsupported_mime_type(client: TestClient, tmp_path) -> None:
-    os.environ["LOCAL_STORAGE_BASE_PATH"] = str(tmp_path / "data" / "notes")
-    from app.core.settings import get_settings
-
-    get_settings.cache_clear()
-
-    patient_id = create_patient(client=client, name="Carol Example", date_of_birth="1992-01-01")
+async def test_create_patient_note_file_rejects_unsupported_mime_type(
+    async_client: httpx.AsyncClient,
+    note_storage_dir: Path,
+    patient_factory: PatientFactory,
+) -> None:
+    patient_id = await patient_factory(name="Carol Example", date_of_birth="1992-01-01")
 
     taken_at = datetime.now(timezone.utc).isoformat()
-    resp = client.post(
+    resp = await async_client.post(
         f"/patients/{patient_id}/notes",
         files={"file": ("x.bin", b"binary", "application/octet-stream")},
         data={"taken_at": taken_at},
@@ -26,17 +26,15 @@ def test_create_patient_note_file_rejects_unsupported_mime_type(client: TestClie
     assert resp.status_code == 415, resp.text
 
 
-def test_create_patient_note_file_upload_happy_path(client: TestClient, tmp_path) -> None:
-    base_dir = tmp_path / "data" / "notes"
-    os.environ["LOCAL_STORAGE_BASE_PATH"] = str(base_dir)
-    from app.core.settings import get_settings
-
-    get_settings.cache_clear()
-
-    patient_id = create_patient(client=client, name="Dana Example", date_of_birth="1993-01-01")
+async def test_create_patient_note_file_upload_happy_path(
+    async_client: httpx.AsyncClient,
+    note_storage_dir: Path,
+    patient_factory: PatientFactory,
+) -> None:
+    patient_id = await patient_factory(name="Dana Example", date_of_birth="1993-01-01")
     taken_at = datetime.now(timezone.utc).isoformat()
 
-    resp = client.post(
+    resp = await async_client.post(
         f"/patients/{patient_id}/notes",
         files={"file": ("note.txt", b"hello", "text/plain")},
         data={"taken_at": taken_at, "note_type": "discharge"},
@@ -49,28 +47,25 @@ def test_create_patient_note_file_upload_happy_path(client: TestClient, tmp_path
     assert data["content_mime_type"] == "text/plain"
     assert data["has_file"] is True
 
-    # API must not expose filesystem paths; validate file exists by scanning under base_dir.
+    # API must not expose filesystem paths; validate the file exists under its note directory
+    # (a single leaf file with a random name).
     note_id = data["id"]
-    note_dir = base_dir / patient_id / note_id
-    assert note_dir.exists()
-    assert any(p.is_file() for p in note_dir.rglob("*"))
+    note_dir = note_storage_dir / patient_id / note_id
+    stored = list(note_dir.iterdir())
+    assert len(stored) == 1 and stored[0].is_file()
 
 
-def test_create_patient_note_pdf_sniffs_content_type_when_client_sends_text_plain(
-    client: TestClient, tmp_path
+async def test_create_patient_note_pdf_sniffs_content_type_when_client_sends_text_plain(
+    async_client: httpx.AsyncClient,
+    note_storage_dir: Path,
+    patient_factory: PatientFactory,
 ) -> None:
-    base_dir = tmp_path / "data" / "notes"
-    os.environ["LOCAL_STORAGE_BASE_PATH"] = str(base_dir)
-    from app.core.settings import get_settings
-
-    get_settings.cache_clear()
-
-    patient_id = create_patient(client=client, name="PDF Example", date_of_birth="1993-01-01")
+    patient_id = await patient_factory(name="PDF Example", date_of_birth="1993-01-01")
     taken_at = datetime.now(timezone.utc).isoformat()
 
     # Some clients mislabel PDFs as text/plain; we should sniff %PDF- and store application/pdf.
     fake_pdf = b"%PDF-1.7\n%fake\n"
-    resp = client.post(
+    resp = await async_client.post(
         f"/patients/{patient_id}/notes",
         files={"file": ("test.pdf", fake_pdf, "text/plain")},
         data={"taken_at": taken_at},
@@ -80,3 +75,22 @@ def test_create_patient_note_pdf_sniffs_content_type_when_client_sends_text_plai
     assert data["content_mime_type"] == "application/pdf"
 
 
+async def test_create_patient_note_file_rejects_oversized_upload(
+    async_client: httpx.AsyncClient,
+    tmp_path: Path,
+    override_notes_settings: Callable[..., Settings],
+    patient_factory: PatientFactory,
+) -> None:
+    base_dir = tmp_path / "data" / "notes"
+    override_notes_settings(local_storage_base_path=str(base_dir), max_note_upload_mb=1)
+
+    patient_id = await patient_factory(name="Big Upload", date_of_birth="1990-01-01")
+    taken_at = datetime.now(timezone.utc).isoformat()
+
+    resp = await async_client.post(
+        f"/patients/{patient_id}/notes",
+        files={"file": ("big.txt", b"x" * (2 << 20), "text/plain")},
+        data={"taken_at": taken_at},
+    )
+    assert resp.status_code == 413, resp.text
+    assert not base_dir.exists() or not any(p.is_file() for p in base_dir.rglob("*"))
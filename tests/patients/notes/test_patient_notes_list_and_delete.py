@@ -1,25 +1,27 @@
 from __future__ import annotations
 
-import os
 from datetime import datetime, timedelta, timezone
+from pathlib import Path
 
-from starlette.testclient import TestClient
+import httpx
+import pytest
 
-from tests.patients._helpers import create_patient
+from tests.patients._helpers import NotesFactory, PatientFactory
 
 
-def test_list_patient_notes_default_sort_desc_and_cursor(client: TestClient) -> None:
-    patient_id = create_patient(client=client, name="Eve Example", date_of_birth="1990-01-01")
+async def test_list_patient_notes_default_sort_desc_and_cursor(
+    async_client: httpx.AsyncClient,
+    patient_factory: PatientFactory,
+    notes_factory: NotesFactory,
+) -> None:
+    patient_id = await patient_factory(name="Eve Example", date_of_birth="1990-01-01")
 
     base = datetime(2025, 1, 1, tzinfo=timezone.utc)
-    for i in range(3):
-        resp = client.post(
-            f"/patients/{patient_id}/notes",
-            json={"taken_at": (base + timedelta(minutes=i)).isoformat(), "content_text": f"n{i}"},
-        )
-        assert resp.status_code == 201, resp.text
-
-    resp1 = client.get(f"/patients/{patient_id}/notes?limit=2")
+    await notes_factory(
+        patient_id=patient_id, notes=[(base + timedelta(minutes=i), f"n{i}") for i in range(3)]
+    )
+
+    resp1 = await async_client.get(f"/patients/{patient_id}/notes?limit=2")
     assert resp1.status_code == 200, resp1.text
     page1 = resp1.json()
     assert page1["limit"] == 2
@@ -28,24 +30,24 @@ def test_list_patient_notes_default_sort_desc_and_cursor(client: TestClient) ->
     assert page1["items"][1]["content_text"] == "n1"
     assert page1["next_cursor"] is not None
 
-    resp2 = client.get(f"/patients/{patient_id}/notes?limit=2&cursor={page1['next_cursor']}")
+    resp2 = await async_client.get(
+        f"/patients/{patient_id}/notes?limit=2&cursor={page1['next_cursor']}"
+    )
     assert resp2.status_code == 200, resp2.text
     page2 = resp2.json()
     assert len(page2["items"]) == 1
     assert page2["items"][0]["content_text"] == "n0"
 
 
-def test_delete_patient_note_soft_deletes_and_cleans_up_file(client: TestClient, tmp_path) -> None:
-    base_dir = tmp_path / "data" / "notes"
-    os.environ["LOCAL_STORAGE_BASE_PATH"] = str(base_dir)
-    from app.core.settings import get_settings
-
-    get_settings.cache_clear()
-
-    patient_id = create_patient(client=client, name="Frank Example", date_of_birth="1990-01-01")
+async def test_delete_patient_note_soft_deletes_and_cleans_up_file(
+    async_client: httpx.AsyncClient,
+    note_storage_dir: Path,
+    patient_factory: PatientFactory,
+) -> None:
+    patient_id = await patient_factory(name="Frank Example", date_of_birth="1990-01-01")
 
     taken_at = datetime.now(timezone.utc).isoformat()
-    create = client.post(
+    create = await async_client.post(
         f"/patients/{patient_id}/notes",
         files={"file": ("note.txt", b"hello", "text/plain")},
         data={"taken_at": taken_at},
@@ -53,39 +55,39 @@ def test_delete_patient_note_soft_deletes_and_cleans_up_file(client: TestClient,
     assert create.status_code == 201, create.text
     note_id = create.json()["id"]
 
-    # Ensure file exists under patient/note directory.
-    note_dir = base_dir / patient_id / note_id
-    assert note_dir.exists()
-    assert any(p.is_file() for p in note_dir.rglob("*"))
+    # Ensure the file exists under the patient/note directory (stored as a single leaf file).
+    note_dir = note_storage_dir / patient_id / note_id
+    stored = list(note_dir.iterdir())
+    assert len(stored) == 1 and stored[0].is_file()
 
-    delete = client.delete(f"/patients/{patient_id}/notes/{note_id}")
+    delete = await async_client.delete(f"/patients/{patient_id}/notes/{note_id}")
     assert delete.status_code == 204, delete.text
 
     # After delete, note should not appear in list and file should be removed.
-    listed = client.get(f"/patients/{patient_id}/notes")
+    listed = await async_client.get(f"/patients/{patient_id}/notes")
     assert listed.status_code == 200, listed.text
     ids = [n["id"] for n in listed.json()["items"]]
     assert note_id not in ids
 
-    assert not any(p.is_file() for p in note_dir.rglob("*"))
+    assert not stored[0].exists()
 
 
-def test_list_patient_notes_includes_has_structured_data_flag_but_not_payload(
-    client: TestClient,
+async def test_list_patient_notes_includes_has_structured_data_flag_but_not_payload(
+    async_client: httpx.AsyncClient, patient_factory: PatientFactory
 ) -> None:
-    patient_id = create_patient(client=client, name="List Structured Flag", date_of_birth="1990-01-01")
+    patient_id = await patient_factory(name="List Structured Flag", date_of_birth="1990-01-01")
     taken_at = datetime.now(timezone.utc).isoformat()
 
     # Create a SOAP note so derived structured data is persisted at write time.
     soap_text = "S: subj\nO: obj\nA: assess\nP: plan"
-    created = client.post(
+    created = await async_client.post(
         f"/patients/{patient_id}/notes",
         json={"taken_at": taken_at, "note_type": "soap", "content_text": soap_text},
     )
     assert created.status_code == 201, created.text
     note_id = created.json()["id"]
 
-    listed = client.get(f"/patients/{patient_id}/notes?limit=10")
+    listed = await async_client.get(f"/patients/{patient_id}/notes?limit=10")
     assert listed.status_code == 200, listed.text
     items = listed.json()["items"]
     assert any(i["id"] == note_id for i in items)
@@ -94,3 +96,65 @@ def test_list_patient_notes_includes_has_structured_data_flag_but_not_payload(
     assert item["has_structured_data"] is True
     assert "structured_data" not in item
 
+
+async def test_note_endpoints_distinguish_missing_patient_and_missing_note(
+    async_client: httpx.AsyncClient, patient_factory: PatientFactory
+) -> None:
+    missing_id = "00000000-0000-0000-0000-000000000000"
+    patient_id = await patient_factory(name="Nia Example", date_of_birth="1990-01-01")
+
+    resp = await async_client.get(f"/patients/{missing_id}/notes")
+    assert resp.status_code == 404
+    assert resp.json()["detail"] == "Patient not found"
+
+    resp = await async_client.get(f"/patients/{missing_id}/notes?cursor=not-a-cursor")
+    assert resp.status_code == 404
+
+    resp = await async_client.get(f"/patients/{patient_id}/notes")
+    assert resp.status_code == 200
+    assert resp.json()["items"] == []
+
+    resp = await async_client.get(f"/patients/{patient_id}/notes?cursor=not-a-cursor")
+    assert resp.status_code == 400
+
+    resp = await async_client.get(f"/patients/{missing_id}/notes/{missing_id}")
+    assert resp.status_code == 404
+    assert resp.json()["detail"] == "Patient not found"
+
+    resp = await async_client.get(f"/patients/{patient_id}/notes/{missing_id}")
+    assert resp.status_code == 404
+    assert resp.json()["detail"] == "Note not found"
+
+    resp = await async_client.delete(f"/patients/{patient_id}/notes/{missing_id}")
+    assert resp.status_code == 404
+    assert resp.json()["detail"] == "Note not found"
+
+
+async def test_delete_patient_note_keeps_note_when_file_removal_fails(
+    async_client: httpx.AsyncClient,
+    note_storage_dir: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    patient_factory: PatientFactory,
+) -> None:
+    from app.patients.notes.storage import LocalFileStorage, StorageIOError
+
+    patient_id = await patient_factory(name="Failing Delete", date_of_birth="1990-01-01")
+    create = await async_client.post(
+        f"/patients/{patient_id}/notes",
+        files={"file": ("note.txt", b"hello", "text/plain")},
+        data={"taken_at": datetime.now(timezone.utc).isoformat()},
+    )
+    assert create.status_code == 201, create.text
+    note_id = create.json()["id"]
+
+    async def failing_delete(self, *, key: str) -> None:
+        raise StorageIOError("Failed to delete file")
+
+    monkeypatch.setattr(LocalFileStorage, "delete", failing_delete)
+
+    delete = await async_client.delete(f"/patients/{patient_id}/notes/{note_id}")
+    assert delete.status_code == 500
+
+    # The soft delete must not be committed while the content is still stored.
+    resp = await async_client.get(f"/patients/{patient_id}/notes/{note_id}")
+    assert resp.status_code == 200, resp.text
@@ -1,66 +1,48 @@
 from __future__ import annotations
 
-import json
-import os
-import sqlite3
 import uuid
 from datetime import UTC, datetime
+from pathlib import Path
 
-from starlette.testclient import TestClient
+import httpx
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncConnection
 
-from tests.patients._helpers import create_patient
+from app.patients.notes.models import PatientNoteStructured
+from tests.patients._helpers import PatientFactory
 
+# Fixed, valid (past) note time: keeps payloads deterministic.
+TAKEN_AT = datetime(2025, 1, 1, tzinfo=UTC).isoformat()
 
-def _sqlite_path_from_database_url() -> str:
-    url = os.environ["DATABASE_URL"]
-    prefix = "sqlite+aiosqlite:///"
-    assert url.startswith(prefix)
-    return url[len(prefix) :]
 
-
-def _fetch_structured_payload(*, note_id: str) -> dict:
-    db_path = _sqlite_path_from_database_url()
-    con = sqlite3.connect(db_path)
-    try:
-        cur = con.cursor()
-        # SQLite representation of UUIDs depends on SQLAlchemy type/dialect, so we
-        # scan and normalize to compare against the API string UUID.
-        cur.execute("SELECT note_id, data FROM patient_note_structured")
-        rows = cur.fetchall()
-        assert rows, "expected derived structured row(s) to be persisted"
-
-        for note_id_db, data in rows:
-            try:
-                if isinstance(note_id_db, bytes):
-                    normalized = str(uuid.UUID(bytes=note_id_db))
-                else:
-                    s = str(note_id_db)
-                    # Some dialects store UUID as 32-char hex without dashes.
-                    normalized = str(uuid.UUID(hex=s)) if len(s) == 32 else str(uuid.UUID(s))
-            except Exception:  # noqa: BLE001
-                continue
-
-            if normalized == note_id:
-                return json.loads(data) if isinstance(data, str) else data
-
-        raise AssertionError("expected derived structured row to be persisted for note_id")
-    finally:
-        con.close()
+async def _fetch_structured_payload(*, conn: AsyncConnection, note_id: str) -> dict:
+    # Read through the test's connection: the API's writes only exist inside its (never
+    # committed) transaction. Binding the UUID through the column type matches however the
+    # dialect stores it, so this is a single keyed lookup.
+    data = await conn.scalar(
+        select(PatientNoteStructured.data).where(
+            PatientNoteStructured.note_id == uuid.UUID(note_id)
+        )
+    )
+    assert data is not None, "expected derived structured row to be persisted for note_id"
+    return data
 
 
-def test_create_patient_note_inline_soap_persists_structured_data(client: TestClient) -> None:
-    patient_id = create_patient(client=client, name="Soap Inline", date_of_birth="1990-01-01")
-    taken_at = datetime.now(UTC).isoformat()
+async def test_create_patient_note_inline_soap_persists_structured_data(
+    async_client: httpx.AsyncClient, db_connection: AsyncConnection, patient_factory: PatientFactory
+) -> None:
+    patient_id = await patient_factory(name="Soap Inline", date_of_birth="1990-01-01")
 
     soap_text = "S: subj\nO: obj\nA: assess\nP: plan"
-    resp = client.post(
+    resp = await async_client.post(
         f"/patients/{patient_id}/notes",
-        json={"taken_at": taken_at, "note_type": "soap", "content_text": soap_text},
+        json={"taken_at": TAKEN_AT, "note_type": "soap", "content_text": soap_text},
     )
     assert resp.status_code == 201, resp.text
 
     note_id = resp.json()["id"]
-    payload = _fetch_structured_payload(note_id=note_id)
+    payload = await _fetch_structured_payload(conn=db_connection, note_id=note_id)
 
     assert payload["schema"] == "soap_v1"
     assert payload["parsed_from"] == "text"
@@ -72,45 +54,72 @@ def test_create_patient_note_inline_soap_persists_structured_data(client: TestCl
     assert payload["sections"]["plan"] == "plan"
 
 
-def test_create_patient_note_file_soap_persists_structured_data(
-    client: TestClient, tmp_path
+async def test_create_patient_note_file_soap_persists_structured_data(
+    async_client: httpx.AsyncClient,
+    db_connection: AsyncConnection,
+    note_storage_dir: Path,
+    patient_factory: PatientFactory,
 ) -> None:
-    os.environ["LOCAL_STORAGE_BASE_PATH"] = str(tmp_path / "data" / "notes")
-    from app.core.settings import get_settings
-
-    get_settings.cache_clear()
-
-    patient_id = create_patient(client=client, name="Soap File", date_of_birth="1990-01-01")
-    taken_at = datetime.now(UTC).isoformat()
+    patient_id = await patient_factory(name="Soap File", date_of_birth="1990-01-01")
 
     soap_bytes = b"S: subj\nO: obj\nA: assess\nP: plan"
-    resp = client.post(
+    resp = await async_client.post(
         f"/patients/{patient_id}/notes",
         files={"file": ("note.txt", soap_bytes, "text/plain")},
-        data={"taken_at": taken_at, "note_type": "soap"},
+        data={"taken_at": TAKEN_AT, "note_type": "soap"},
     )
     assert resp.status_code == 201, resp.text
 
     note_id = resp.json()["id"]
-    payload = _fetch_structured_payload(note_id=note_id)
+    payload = await _fetch_structured_payload(conn=db_connection, note_id=note_id)
     assert payload["schema"] == "soap_v1"
     assert payload["confidence"] == "high"
 
 
-def test_create_patient_note_inline_soap_missing_sections_is_partial_but_not_rejected(
-    client: TestClient,
+async def test_create_patient_note_inline_soap_missing_sections_is_partial_but_not_rejected(
+    async_client: httpx.AsyncClient, db_connection: AsyncConnection, patient_factory: PatientFactory
 ) -> None:
-    patient_id = create_patient(client=client, name="Soap Partial", date_of_birth="1990-01-01")
-    taken_at = datetime.now(UTC).isoformat()
+    patient_id = await patient_factory(name="Soap Partial", date_of_birth="1990-01-01")
 
     soap_text = "S: subj\nO: obj\nA: assess"
-    resp = client.post(
+    resp = await async_client.post(
         f"/patients/{patient_id}/notes",
-        json={"taken_at": taken_at, "note_type": "soap", "content_text": soap_text},
+        json={"taken_at": TAKEN_AT, "note_type": "soap", "content_text": soap_text},
     )
     assert resp.status_code == 201, resp.text
 
     note_id = resp.json()["id"]
-    payload = _fetch_structured_payload(note_id=note_id)
+    payload = await _fetch_structured_payload(conn=db_connection, note_id=note_id)
     assert payload["confidence"] == "partial"
     assert payload["sections"]["plan"] is None
+
+
+async def test_create_patient_note_soap_is_kept_when_structured_insert_fails(
+    async_client: httpx.AsyncClient,
+    db_connection: AsyncConnection,
+    monkeypatch: pytest.MonkeyPatch,
+    patient_factory: PatientFactory,
+) -> None:
+    from app.patients.notes import service as notes_service
+
+    patient_id = await patient_factory(name="Soap Dropped", date_of_birth="1990-01-01")
+    build_row = notes_service._build_soap_structured_row
+
+    def build_orphan_row(**kwargs):
+        # Point the derived row at a note that does not exist so its insert violates the FK.
+        row = build_row(**kwargs)
+        row.note_id = uuid.uuid4()
+        return row
+
+    monkeypatch.setattr(notes_service, "_build_soap_structured_row", build_orphan_row)
+
+    resp = await async_client.post(
+        f"/patients/{patient_id}/notes",
+        json={"taken_at": TAKEN_AT, "note_type": "soap", "content_text": "S: s\nO: o\nA: a\nP: p"},
+    )
+    assert resp.status_code == 201, resp.text
+
+    note_id = resp.json()["id"]
+    got = await async_client.get(f"/patients/{patient_id}/notes/{note_id}")
+    assert got.status_code == 200, got.text
+    assert await db_connection.scalar(select(PatientNoteStructured.id)) is None
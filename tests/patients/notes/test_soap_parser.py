@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+from app.patients.notes.soap_parser import parse_soap
+
+
+def test_parse_soap_handles_lowercase_and_repeated_markers() -> None:
+    result = parse_soap("s: one\no: two\nS: three\na: four\np: five")
+
+    assert result is not None
+    assert result.confidence == "high"
+    assert result.sections == {
+        "subjective": "one\n\nthree\n",
+        "objective": "two\n",
+        "assessment": "four\n",
+        "plan": "five",
+    }
+
+
+def test_parse_soap_without_markers_returns_none() -> None:
+    assert parse_soap("Patient is stable.") is None
+    assert parse_soap("") is None
@@ -2,25 +2,126 @@
 
 from __future__ import annotations
 
-from starlette.testclient import TestClient
+import httpx
+import pytest
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncConnection
 
-from tests.patients._helpers import create_patient
+from tests.patients._helpers import PatientFactory, create_patient
 
 
-def test_patient_crud_lifecycle_happy_path(client: TestClient) -> None:
+async def test_patient_crud_lifecycle_happy_path(async_client: httpx.AsyncClient) -> None:
     """Create -> Get -> Update -> Delete -> 404."""
-    patient_id = create_patient(client=client, name="Ada Lovelace", date_of_birth="1815-12-10")
+    patient_id = await create_patient(
+        client=async_client, name="Ada Lovelace", date_of_birth="1815-12-10"
+    )
 
-    get_res = client.get(f"/patients/{patient_id}")
+    get_res = await async_client.get(f"/patients/{patient_id}")
     assert get_res.status_code == 200
     assert get_res.json()["id"] == patient_id
 
-    update_res = client.put(f"/patients/{patient_id}", json={"name": "Ada King"})
+    update_res = await async_client.put(f"/patients/{patient_id}", json={"name": "Ada King"})
     assert update_res.status_code == 200
     assert update_res.json()["name"] == "Ada King"
+    assert update_res.json()["date_of_birth"] == "1815-12-10"
 
-    delete_res = client.delete(f"/patients/{patient_id}")
+    # An existing patient still gets the validation error.
+    mrn_res = await async_client.put(f"/patients/{patient_id}", json={"mrn": "MRN-X1"})
+    assert mrn_res.status_code == 400, mrn_res.text
+
+    delete_res = await async_client.delete(f"/patients/{patient_id}")
     assert delete_res.status_code == 204
 
-    missing_res = client.get(f"/patients/{patient_id}")
+    missing_res = await async_client.get(f"/patients/{patient_id}")
     assert missing_res.status_code == 404
+
+
+async def test_create_patient_with_duplicate_mrn_is_rejected(
+    async_client: httpx.AsyncClient,
+) -> None:
+    """A client-provided MRN that is already in use maps to a business validation error."""
+    payload = {"name": "Ada Lovelace", "date_of_birth": "1815-12-10", "mrn": "MRN-DUP-1"}
+    first = await async_client.post("/patients", json=payload, follow_redirects=False)
+    assert first.status_code == 201, first.text
+
+    second = await async_client.post("/patients", json=payload, follow_redirects=False)
+    assert second.status_code == 400
+    assert second.json()["detail"] == "MRN is already in use."
+
+
+async def test_create_patient_reraises_integrity_errors_other_than_mrn_conflicts(
+    async_client: httpx.AsyncClient, db_connection: AsyncConnection
+) -> None:
+    """Only `uq_patients_mrn` conflicts are retried (or reported as MRN errors)."""
+    # Rolled back with the test transaction.
+    await db_connection.exec_driver_sql(
+        "CREATE TEMP TRIGGER reject_patients BEFORE INSERT ON patients "
+        "BEGIN SELECT RAISE(ABORT, 'CHECK constraint failed: test'); END"
+    )
+
+    with pytest.raises(IntegrityError):
+        await async_client.post(
+            "/patients",
+            json={"name": "Ada Lovelace", "date_of_birth": "1815-12-10"},
+            follow_redirects=False,
+        )
+
+
+async def test_create_patient_with_invalid_mrn_characters_is_rejected(
+    async_client: httpx.AsyncClient,
+) -> None:
+    """MRNs are limited to ASCII letters, digits and hyphens."""
+    for mrn in ("MRN 123", "MRN_123", "MRN-é1"):
+        res = await async_client.post(
+            "/patients",
+            json={"name": "Ada Lovelace", "date_of_birth": "1815-12-10", "mrn": mrn},
+            follow_redirects=False,
+        )
+        assert res.status_code == 400, mrn
+        assert res.json()["detail"] == "MRN contains invalid characters."
+
+
+async def test_update_and_delete_missing_patient_return_404(
+    async_client: httpx.AsyncClient,
+) -> None:
+    """PUT / DELETE on an unknown id are 404s (no separate existence probe)."""
+    missing_id = "00000000-0000-0000-0000-000000000000"
+
+    update_res = await async_client.put(f"/patients/{missing_id}", json={"name": "Ada King"})
+    assert update_res.status_code == 404
+
+    empty_update_res = await async_client.put(f"/patients/{missing_id}", json={})
+    assert empty_update_res.status_code == 404
+
+    # Payloads that would fail validation still report the missing patient first.
+    for payload in ({"mrn": "MRN-X1"}, {"date_of_birth": "2999-01-01"}):
+        invalid_update_res = await async_client.put(f"/patients/{missing_id}", json=payload)
+        assert invalid_update_res.status_code == 404, invalid_update_res.text
+
+    delete_res = await async_client.delete(f"/patients/{missing_id}")
+    assert delete_res.status_code == 404
+
+
+async def test_delete_patient_with_notes_is_a_conflict(
+    async_client: httpx.AsyncClient, patient_factory: PatientFactory
+) -> None:
+    """Notes restrict patient deletion, even once they are all soft-deleted."""
+    patient_id = await patient_factory(name="Ada Lovelace", date_of_birth="1815-12-10")
+    note_res = await async_client.post(
+        f"/patients/{patient_id}/notes",
+        json={"taken_at": "2025-01-01T00:00:00+00:00", "content_text": "Stable."},
+    )
+    assert note_res.status_code == 201, note_res.text
+
+    delete_res = await async_client.delete(f"/patients/{patient_id}")
+    assert delete_res.status_code == 409, delete_res.text
+
+    note_id = note_res.json()["id"]
+    note_delete_res = await async_client.delete(f"/patients/{patient_id}/notes/{note_id}")
+    assert note_delete_res.status_code == 204
+    delete_res = await async_client.delete(f"/patients/{patient_id}")
+    assert delete_res.status_code == 409, delete_res.text
+
+    # The patient is untouched.
+    get_res = await async_client.get(f"/patients/{patient_id}")
+    assert get_res.status_code == 200
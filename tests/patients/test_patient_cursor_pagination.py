@@ -2,18 +2,20 @@
 
 from __future__ import annotations
 
-from starlette.testclient import TestClient
+import httpx
 
-from tests.patients._helpers import create_patient
+from tests.patients._helpers import PatientFactory
 
 
-def test_patient_cursor_pagination_ordered_by_name(client: TestClient) -> None:
+async def test_patient_cursor_pagination_ordered_by_name(
+    async_client: httpx.AsyncClient, patient_factory: PatientFactory
+) -> None:
     """Cursor pagination preserves ordering and avoids duplicates."""
-    create_patient(client=client, name="Ada Lovelace", date_of_birth="1815-12-10")
-    create_patient(client=client, name="Alan Turing", date_of_birth="1912-06-23")
-    create_patient(client=client, name="Grace Hopper", date_of_birth="1906-12-09")
+    await patient_factory(name="Ada Lovelace", date_of_birth="1815-12-10")
+    await patient_factory(name="Alan Turing", date_of_birth="1912-06-23")
+    await patient_factory(name="Grace Hopper", date_of_birth="1906-12-09")
 
-    page1 = client.get("/patients", params={"limit": 2, "sort": "name", "order": "asc"})
+    page1 = await async_client.get("/patients", params={"limit": 2, "sort": "name", "order": "asc"})
     assert page1.status_code == 200
     p1 = page1.json()
 
@@ -21,7 +23,7 @@ def test_patient_cursor_pagination_ordered_by_name(client: TestClient) -> None:
     assert page1_items == sorted(page1_items, key=lambda p: p["name"])
     assert p1["next_cursor"] is not None
 
-    page2 = client.get(
+    page2 = await async_client.get(
         "/patients",
         params={"limit": 2, "sort": "name", "order": "asc", "cursor": p1["next_cursor"]},
     )
@@ -31,3 +33,33 @@ def test_patient_cursor_pagination_ordered_by_name(client: TestClient) -> None:
     assert page2_items == sorted(page2_items, key=lambda p: p["name"])
 
     assert set(p["id"] for p in page1_items).isdisjoint({p["id"] for p in page2_items})
+
+
+async def test_patient_cursor_pagination_desc_with_ties_visits_every_row(
+    async_client: httpx.AsyncClient, patient_factory: PatientFactory
+) -> None:
+    """Walking every page in DESC order (with tied sort values) returns each patient once."""
+    dobs = ["1990-01-01", "1990-01-01", "1990-01-01", "1980-05-05", "1970-07-07"]
+    ids = {
+        await patient_factory(name=f"Patient {i}", date_of_birth=dob) for i, dob in enumerate(dobs)
+    }
+
+    for sort in ("date_of_birth", "name"):
+        seen: list[dict] = []
+        cursor = None
+        while True:
+            params = {"limit": 2, "sort": sort, "order": "desc"}
+            if cursor:
+                params["cursor"] = cursor
+            res = await async_client.get("/patients", params=params)
+            assert res.status_code == 200, res.text
+            page = res.json()
+            seen.extend(page["items"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+
+        assert len(seen) == len(ids)
+        assert {p["id"] for p in seen} == ids
+        keys = [(p[sort], p["id"]) for p in seen]
+        assert keys == sorted(keys, reverse=True), sort
@@ -3,17 +3,19 @@
 from __future__ import annotations
 
 # ruff: noqa: I001
-from starlette.testclient import TestClient
+import httpx
 
-from tests.patients._helpers import create_patient
+from tests.patients._helpers import PatientFactory
 
 
-def test_patient_list_filter_by_name_case_insensitive(client: TestClient) -> None:
+async def test_patient_list_filter_by_name_case_insensitive(
+    async_client: httpx.AsyncClient, patient_factory: PatientFactory
+) -> None:
     """Filtering is case-insensitive and matches substrings."""
-    ada_id = create_patient(client=client, name="Ada Lovelace", date_of_birth="1815-12-10")
-    _alan_id = create_patient(client=client, name="Alan Turing", date_of_birth="1912-06-23")
+    ada_id = await patient_factory(name="Ada Lovelace", date_of_birth="1815-12-10")
+    _alan_id = await patient_factory(name="Alan Turing", date_of_birth="1912-06-23")
 
-    res = client.get("/patients", params={"name": "ada", "limit": 50})
+    res = await async_client.get("/patients", params={"name": "ada", "limit": 50})
     assert res.status_code == 200
     payload = res.json()
 
@@ -21,3 +23,15 @@ def test_patient_list_filter_by_name_case_insensitive(client: TestClient) -> Non
     assert "next_cursor" in payload
     assert len(payload["items"]) == 1
     assert payload["items"][0]["id"] == ada_id
+
+
+async def test_patient_list_filter_treats_like_wildcards_literally(
+    async_client: httpx.AsyncClient, patient_factory: PatientFactory
+) -> None:
+    """`%` and `_` in the search term match themselves, not any characters."""
+    await patient_factory(name="Ada Lovelace", date_of_birth="1815-12-10")
+
+    for term in ("%%%", "_da"):
+        res = await async_client.get("/patients", params={"name": term, "limit": 50})
+        assert res.status_code == 200
+        assert res.json()["items"] == []
@@ -1,14 +1,17 @@
 from __future__ import annotations
 
-from datetime import date, UTC, datetime
+from collections.abc import Awaitable, Callable
+from datetime import UTC, date, datetime
 
+import httpx
 import pytest
-from fastapi.testclient import TestClient
+from fastapi import FastAPI
+from sqlalchemy import event
 
 from app.core.llm.deps import get_openai_client
 from app.core.llm.openai_client import OpenAIUpstreamError
 from app.main import create_app
-from tests.patients._helpers import create_patient
+from tests.patients._helpers import PatientFactory, create_patient
 
 
 def _expected_age(*, dob: date, today: date | None = None) -> int:
@@ -30,57 +33,183 @@ class _FailingOpenAIClient:
         raise OpenAIUpstreamError("upstream failed")
 
 
+_ClientFactory = Callable[[FastAPI], Awaitable[httpx.AsyncClient]]
+
+
 @pytest.fixture
-def summary_client() -> TestClient:
-    app = create_app()
-    app.dependency_overrides[get_openai_client] = lambda: _FakeOpenAIClient()
-    with TestClient(app) as c:
-        yield c
+def summary_client(shared_app: FastAPI, async_client: httpx.AsyncClient) -> httpx.AsyncClient:
+    shared_app.dependency_overrides[get_openai_client] = lambda: _FakeOpenAIClient()
+    return async_client
 
 
-def test_get_patient_summary_success(summary_client: TestClient) -> None:
-    patient_id = create_patient(client=summary_client, name="Ada Lovelace", date_of_birth="1990-12-10")
+async def test_get_patient_summary_success(
+    summary_client: httpx.AsyncClient, patient_factory: PatientFactory
+) -> None:
+    patient_id = await patient_factory(name="Ada Lovelace", date_of_birth="1990-12-10")
     taken_at = datetime.now(UTC).isoformat()
-    resp = summary_client.post(
+    resp = await summary_client.post(
         f"/patients/{patient_id}/notes",
         json={"taken_at": taken_at, "note_type": "soap", "content_text": "S: test\nO: test"},
     )
     assert resp.status_code == 201, resp.text
 
-    res = summary_client.get(f"/patients/{patient_id}/summary?audience=clinician&verbosity=medium")
+    # Bracket the request with the dates on either side, so a run across midnight still knows
+    # every age the server could have computed.
+    before = date.today()
+    res = await summary_client.get(
+        f"/patients/{patient_id}/summary?audience=clinician&verbosity=medium"
+    )
+    after = date.today()
     assert res.status_code == 200, res.text
     assert "X-Request-ID" in res.headers
 
     payload = res.json()
     assert payload["patient_heading"]["name"] == "Ada Lovelace"
     assert payload["patient_heading"]["mrn"].startswith("MRN-")
-    assert payload["patient_heading"]["age"] == _expected_age(dob=date(1990, 12, 10))
+    dob = date(1990, 12, 10)
+    assert payload["patient_heading"]["age"] in {
+        _expected_age(dob=dob, today=before),
+        _expected_age(dob=dob, today=after),
+    }
 
     assert payload["summary"]["audience"] == "clinician"
     assert payload["summary"]["verbosity"] == "medium"
     assert payload["summary"]["text"] == "Stub summary text."
 
 
-def test_get_patient_summary_invalid_audience_returns_400(summary_client: TestClient) -> None:
-    patient_id = create_patient(client=summary_client, name="Test", date_of_birth="1990-01-01")
-    res = summary_client.get(f"/patients/{patient_id}/summary?audience=bad&verbosity=medium")
+async def test_get_patient_summary_invalid_audience_returns_400(
+    summary_client: httpx.AsyncClient, patient_factory: PatientFactory
+) -> None:
+    patient_id = await patient_factory(name="Test", date_of_birth="1990-01-01")
+    res = await summary_client.get(f"/patients/{patient_id}/summary?audience=bad&verbosity=medium")
     assert res.status_code == 400
 
 
-def test_get_patient_summary_patient_not_found_returns_404(summary_client: TestClient) -> None:
-    res = summary_client.get(
+async def test_get_patient_summary_patient_not_found_returns_404(
+    summary_client: httpx.AsyncClient,
+) -> None:
+    res = await summary_client.get(
         "/patients/00000000-0000-0000-0000-000000000000/summary?audience=clinician&verbosity=medium"
     )
     assert res.status_code == 404
 
 
-def test_get_patient_summary_llm_failure_returns_502() -> None:
+async def test_get_patient_summary_llm_failure_returns_502(
+    shared_app: FastAPI, async_client: httpx.AsyncClient, patient_factory: PatientFactory
+) -> None:
+    shared_app.dependency_overrides[get_openai_client] = lambda: _FailingOpenAIClient()
+    patient_id = await patient_factory(name="Test", date_of_birth="1990-01-01")
+    resp = await async_client.post(
+        f"/patients/{patient_id}/notes",
+        json={"taken_at": datetime.now(UTC).isoformat(), "content_text": "S: test"},
+    )
+    assert resp.status_code == 201, resp.text
+    res = await async_client.get(
+        f"/patients/{patient_id}/summary?audience=clinician&verbosity=medium"
+    )
+    assert res.status_code == 502
+    assert res.json()["detail"] in {"LLM service failed", "LLM service unavailable"}
+
+
+async def test_get_patient_summary_releases_db_connection_before_llm_call(
+    async_client_factory: _ClientFactory,
+) -> None:
+    """The pooled connection is returned before the (slow) LLM call starts."""
     app = create_app()
-    app.dependency_overrides[get_openai_client] = lambda: _FailingOpenAIClient()
-    with TestClient(app) as client:
-        patient_id = create_patient(client=client, name="Test", date_of_birth="1990-01-01")
-        res = client.get(f"/patients/{patient_id}/summary?audience=clinician&verbosity=medium")
-        assert res.status_code == 502
-        assert res.json()["detail"] in {"LLM service failed", "LLM service unavailable"}
+    checked_out = 0
+    checked_out_during_llm: list[int] = []
+
+    def _on_checkout(*_args: object) -> None:
+        nonlocal checked_out
+        checked_out += 1
+
+    def _on_checkin(*_args: object) -> None:
+        nonlocal checked_out
+        checked_out -= 1
+
+    class _PoolProbingClient:
+        async def generate_json(self, *, system_prompt: str, user_prompt: str) -> dict:
+            checked_out_during_llm.append(checked_out)
+            return {"text": "Stub summary text."}
+
+    app.dependency_overrides[get_openai_client] = lambda: _PoolProbingClient()
+    client = await async_client_factory(app)
+    patient_id = await create_patient(
+        client=client, name="Ada Lovelace", date_of_birth="1990-12-10"
+    )
+    resp = await client.post(
+        f"/patients/{patient_id}/notes",
+        json={"taken_at": datetime.now(UTC).isoformat(), "content_text": "S: check-up"},
+    )
+    assert resp.status_code == 201, resp.text
+    pool = app.state.db_engine.sync_engine.pool
+    event.listen(pool, "checkout", _on_checkout)
+    event.listen(pool, "checkin", _on_checkin)
+
+    res = await client.get(f"/patients/{patient_id}/summary")
+    assert res.status_code == 200, res.text
+
+    assert checked_out_during_llm == [0]
+
 
+async def test_get_patient_summary_cache_reuses_identical_prompts(
+    shared_app: FastAPI,
+    async_client: httpx.AsyncClient,
+    monkeypatch: pytest.MonkeyPatch,
+    patient_factory: PatientFactory,
+) -> None:
+    from app.core.settings import get_settings
+    from app.patients.summary import service as summary_service
 
+    monkeypatch.setenv("SUMMARY_CACHE_TTL_SECONDS", "60")
+    get_settings.cache_clear()
+    summary_service._SUMMARY_CACHE.clear()
+    calls: list[str] = []
+
+    class _CountingClient:
+        async def generate_json(self, *, system_prompt: str, user_prompt: str) -> dict:
+            calls.append(user_prompt)
+            return {"text": f"Summary {len(calls)}"}
+
+    shared_app.dependency_overrides[get_openai_client] = lambda: _CountingClient()
+    patient_id = await patient_factory(name="Ada Lovelace", date_of_birth="1990-12-10")
+    resp = await async_client.post(
+        f"/patients/{patient_id}/notes",
+        json={"taken_at": datetime.now(UTC).isoformat(), "content_text": "S: check-up"},
+    )
+    assert resp.status_code == 201, resp.text
+
+    first = await async_client.get(f"/patients/{patient_id}/summary")
+    second = await async_client.get(f"/patients/{patient_id}/summary")
+    assert first.status_code == second.status_code == 200
+    assert second.json()["summary"]["text"] == first.json()["summary"]["text"]
+    assert len(calls) == 1
+
+    # New input (a note) or different parameters mean a new prompt, so the LLM is called.
+    resp = await async_client.post(
+        f"/patients/{patient_id}/notes",
+        json={"taken_at": datetime.now(UTC).isoformat(), "content_text": "S: follow-up"},
+    )
+    assert resp.status_code == 201, resp.text
+    assert (await async_client.get(f"/patients/{patient_id}/summary")).json()["summary"][
+        "text"
+    ] == ("Summary 2")
+    res = await async_client.get(f"/patients/{patient_id}/summary?verbosity=short")
+    assert res.status_code == 200
+    assert len(calls) == 3
+
+    summary_service._SUMMARY_CACHE.clear()
+
+
+async def test_get_patient_summary_without_notes_skips_llm(
+    shared_app: FastAPI, async_client: httpx.AsyncClient, patient_factory: PatientFactory
+) -> None:
+    shared_app.dependency_overrides[get_openai_client] = lambda: _FailingOpenAIClient()
+    patient_id = await patient_factory(name="Ada Lovelace", date_of_birth="1990-12-10")
+    res = await async_client.get(f"/patients/{patient_id}/summary")
+
+    # The failing client would turn any LLM call into a 502.
+    assert res.status_code == 200, res.text
+    payload = res.json()
+    assert payload["summary"]["text"] == "No clinical notes are documented for this patient."
+    assert payload["patient_heading"]["name"] == "Ada Lovelace"
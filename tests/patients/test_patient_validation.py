@@ -0,0 +1,43 @@
+"""Integration tests: request validation that needs no stored data."""
+
+from __future__ import annotations
+
+from typing import Any
+
+import httpx
+import pytest
+
+
+@pytest.mark.parametrize(
+    ("method", "url", "payload", "status_code", "detail_contains"),
+    [
+        pytest.param(
+            "POST",
+            "/patients",
+            # Use a far-future date to avoid flakiness around time zones / midnight boundaries.
+            {"name": "Future Person", "date_of_birth": "2999-01-01"},
+            400,
+            "date_of_birth",
+            id="create-future-date-of-birth",
+        ),
+        pytest.param(
+            "GET",
+            "/patients?name=ad",
+            None,
+            400,
+            "at least 3 characters",
+            id="list-name-filter-too-short",
+        ),
+    ],
+)
+async def test_patient_request_validation(
+    async_client: httpx.AsyncClient,
+    method: str,
+    url: str,
+    payload: dict[str, Any] | None,
+    status_code: int,
+    detail_contains: str,
+) -> None:
+    res = await async_client.request(method, url, json=payload)
+    assert res.status_code == status_code, res.text
+    assert detail_contains in res.json()["detail"]